@@ -13,9 +13,14 @@
 # limitations under the License.
 """metadata implementation"""
 
+import atexit
 import datetime
 import json
+import queue
+import threading
+import time
 import uuid
+from concurrent.futures import Future
 
 # from models.model_setup import ModelSetup
 from dataclasses import asdict, dataclass, field
@@ -161,18 +166,14 @@ class MediaItem:
         if isinstance(self.grounding_info, dict):
             self.grounding_info = json.dumps(self.grounding_info)
 
+    @property
+    def primary_uri(self) -> str | None:
+        """The item's main GCS URI: `gcsuri`, else the first of `gcs_uris`."""
+        return self.gcsuri or (self.gcs_uris[0] if self.gcs_uris else None)
 
-def add_media_item_to_firestore(item: MediaItem):
-    """Creates or updates a MediaItem in Firestore.
-    If item.id is None, a new document is created with a Firestore-generated ID.
-    If item.id is provided, the existing document with that ID is updated.
-    """
-    if not db:
-        logger.warning(
-            "Firestore client (db) is not initialized. Cannot add media item.",
-        )
-        return
 
+def _media_item_firestore_data(item: MediaItem) -> dict:
+    """Converts a MediaItem to a Firestore document body, without its ID."""
     # Prepare data for Firestore using asdict
     firestore_data = asdict(item)
 
@@ -190,13 +191,28 @@ def add_media_item_to_firestore(item: MediaItem):
             )
             firestore_data["timestamp"] = datetime.datetime.now(datetime.UTC)
 
+    # The ID is the document's name, not a field.
+    firestore_data.pop("id", None)
+    return firestore_data
+
+
+def add_media_item_to_firestore(item: MediaItem):
+    """Creates or updates a MediaItem in Firestore.
+    If item.id is None, a new document is created with a Firestore-generated ID.
+    If item.id is provided, the existing document with that ID is updated.
+    """
+    if not db:
+        logger.warning(
+            "Firestore client (db) is not initialized. Cannot add media item.",
+        )
+        return
+
+    firestore_data = _media_item_firestore_data(item)
+
     try:
         if item.id:
             # If an ID is provided, update the existing document
             doc_ref = db.collection(config.GENMEDIA_COLLECTION_NAME).document(item.id)
-            # We can remove the 'id' field before setting, as it's the doc's name
-            if "id" in firestore_data:
-                del firestore_data["id"]
             doc_ref.set(firestore_data, merge=True)  # Use merge=True to update fields
             logger.info(
                 f"Successfully updated MediaItem in Firestore with ID: {item.id}",
@@ -204,8 +220,6 @@ def add_media_item_to_firestore(item: MediaItem):
         else:
             # If no ID is provided, create a new document
             doc_ref = db.collection(config.GENMEDIA_COLLECTION_NAME).document()
-            if "id" in firestore_data:
-                del firestore_data["id"]
             doc_ref.set(firestore_data)
             # Set the new Firestore-generated ID back on the object
             item.id = doc_ref.id
@@ -218,11 +232,120 @@ def add_media_item_to_firestore(item: MediaItem):
         raise e
 
 
-def save_storyboard(storyboard: dict) -> dict:
+# Queued MediaItem writes, committed together by a background thread so
+# concurrent sessions share batch commits instead of one RPC per item.
+MEDIA_WRITE_BATCH_INTERVAL_SECONDS = 0.1
+MAX_MEDIA_WRITE_BATCH_SIZE = 500  # Firestore's per-batch write limit.
+# Commit attempts per queued write before its future fails, with the wait
+# before each retry growing from MEDIA_WRITE_RETRY_SECONDS.
+MAX_MEDIA_WRITE_ATTEMPTS = 3
+MEDIA_WRITE_RETRY_SECONDS = 1.0
+_media_write_queue: queue.Queue = queue.Queue()
+_media_write_thread: threading.Thread | None = None
+_media_write_thread_lock = threading.Lock()
+
+
+def _commit_media_writes(pending: list) -> bool:
+    """Commits queued writes in one batch, re-queueing them if it fails.
+
+    Each write's future is resolved once it is committed, or failed once it
+    has run out of attempts. Returns whether the batch was committed.
+    """
+    batch = db.batch()
+    for doc_ref, data, _, _ in pending:
+        batch.set(doc_ref, data, merge=True)
+    try:
+        batch.commit()
+        logger.info(f"Committed {len(pending)} queued MediaItem writes.")
+        for doc_ref, _, _, future in pending:
+            future.set_result(doc_ref.id)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to commit {len(pending)} queued MediaItem writes: {e}")
+        error = e
+    for doc_ref, data, attempts, future in pending:
+        if attempts + 1 < MAX_MEDIA_WRITE_ATTEMPTS:
+            _media_write_queue.put((doc_ref, data, attempts + 1, future))
+        else:
+            logger.error(
+                f"CRITICAL: Failed to save MediaItem {doc_ref.id} after "
+                f"{MAX_MEDIA_WRITE_ATTEMPTS} attempts."
+            )
+            future.set_exception(error)
+    return False
+
+
+def _take_queued_media_writes(pending: list) -> list:
+    while len(pending) < MAX_MEDIA_WRITE_BATCH_SIZE:
+        try:
+            pending.append(_media_write_queue.get_nowait())
+        except queue.Empty:
+            break
+    return pending
+
+
+def _run_media_write_loop() -> None:
+    failures = 0
+    while True:
+        # Sleep until a write arrives, then give concurrent writes a moment
+        # to join the same batch.
+        pending = [_media_write_queue.get()]
+        time.sleep(MEDIA_WRITE_BATCH_INTERVAL_SECONDS)
+        if _commit_media_writes(_take_queued_media_writes(pending)):
+            failures = 0
+        else:
+            failures = min(failures + 1, MAX_MEDIA_WRITE_ATTEMPTS)
+            time.sleep(MEDIA_WRITE_RETRY_SECONDS * failures)
+
+
+def _drain_media_write_queue() -> None:
+    while not _media_write_queue.empty():
+        pending = _take_queued_media_writes([])
+        if pending:
+            _commit_media_writes(pending)
+
+
+def queue_media_item_write(item: MediaItem) -> Future:
+    """Queues a MediaItem write to be committed with other pending writes.
+
+    Unlike add_media_item_to_firestore, this returns before the write is
+    committed. New items get their document ID immediately. Use it only for
+    items that are not read back straight away.
+
+    Returns:
+        A future that resolves to the document ID once the write is committed,
+        or raises if it could not be saved.
+    """
+    global _media_write_thread
+    future: Future = Future()
+    if not db:
+        logger.warning(
+            "Firestore client (db) is not initialized. Cannot add media item.",
+        )
+        future.set_exception(RuntimeError("Firestore client is not initialized."))
+        return future
+    collection = db.collection(config.GENMEDIA_COLLECTION_NAME)
+    doc_ref = collection.document(item.id) if item.id else collection.document()
+    item.id = doc_ref.id
+    _media_write_queue.put((doc_ref, _media_item_firestore_data(item), 0, future))
+    with _media_write_thread_lock:
+        if _media_write_thread is None:
+            _media_write_thread = threading.Thread(
+                target=_run_media_write_loop, daemon=True
+            )
+            _media_write_thread.start()
+            atexit.register(_drain_media_write_queue)
+    return future
+
+
+def save_storyboard(storyboard: dict, fields: list[str] | None = None) -> dict:
     """Creates or updates an InteriorDesignStoryboard document in Firestore.
 
     Args:
         storyboard: A dictionary representing the storyboard.
+        fields: Top-level keys changed since the last save. For a storyboard
+            that already exists only these are written; otherwise the whole
+            document is.
 
     Returns:
         The storyboard dictionary, now with an 'id' if it was new.
@@ -231,9 +354,13 @@ def save_storyboard(storyboard: dict) -> dict:
     db = FirebaseClient().get_client()
     if "id" not in storyboard or not storyboard.get("id"):
         storyboard["id"] = str(uuid.uuid4())
+        fields = None
 
     doc_ref = db.collection("interior_design_storyboards").document(storyboard["id"])
-    doc_ref.set(storyboard)
+    if fields:
+        doc_ref.update({name: storyboard.get(name) for name in fields})
+    else:
+        doc_ref.set(storyboard)
     logger.info(f"Storyboard saved to Firestore with ID: {storyboard['id']}")
     return storyboard
 
@@ -457,6 +584,42 @@ def add_vto_metadata(
     logger.info(f"VTO data stored in Firestore with document ID: {doc_ref.id}")
 
 
+def _passes_media_filters(
+    raw_item_data: dict,
+    type_filters: list[str] | None,
+    error_filter: str,
+    filter_by_user_email: str | None,
+) -> bool:
+    """Applies the library's type, error and user filters to a raw document."""
+    # Ensure mime_type is a string, even if it's null in Firestore
+    mime_type = raw_item_data.get("mime_type") or ""
+    error_message_present = bool(raw_item_data.get("error_message"))
+
+    # Apply type filters
+    if not (
+        not type_filters
+        or "all" in type_filters
+        or ("videos" in type_filters and mime_type.startswith("video/"))
+        or ("images" in type_filters and mime_type.startswith("image/"))
+        or ("music" in type_filters and mime_type.startswith("audio/"))
+    ):
+        return False
+
+    # Apply error filter
+    if not (
+        error_filter == "all"
+        or (error_filter == "no_errors" and not error_message_present)
+        or (error_filter == "only_errors" and error_message_present)
+    ):
+        return False
+
+    # Apply user email filter
+    return not (
+        filter_by_user_email
+        and raw_item_data.get("user_email") != filter_by_user_email
+    )
+
+
 def get_media_for_page(
     page: int,
     media_per_page: int,
@@ -505,30 +668,8 @@ def get_media_for_page(
                 logger.warning(f"doc.to_dict() returned None for doc ID: {doc.id}")
                 continue
 
-            # Ensure mime_type is a string, even if it's null in Firestore
-            mime_type = raw_item_data.get("mime_type") or ""
-            error_message_present = bool(raw_item_data.get("error_message"))
-
-            # Apply type filters
-            passes_type_filter = False
-            if not type_filters or "all" in type_filters or ("videos" in type_filters and mime_type.startswith("video/")) or ("images" in type_filters and mime_type.startswith("image/")) or ("music" in type_filters and mime_type.startswith("audio/")):
-                passes_type_filter = True
-
-            if not passes_type_filter:
-                continue
-
-            # Apply error filter
-            passes_error_filter = False
-            if error_filter == "all" or (error_filter == "no_errors" and not error_message_present) or (error_filter == "only_errors" and error_message_present):
-                passes_error_filter = True
-
-            if not passes_error_filter:
-                continue
-
-            # Apply user email filter
-            if (
-                filter_by_user_email
-                and raw_item_data.get("user_email") != filter_by_user_email
+            if not _passes_media_filters(
+                raw_item_data, type_filters, error_filter, filter_by_user_email
             ):
                 continue
 
@@ -552,6 +693,80 @@ def get_media_for_page(
         return []
 
 
+def get_media_page_after(
+    media_per_page: int,
+    start_after: tuple[str, str] | None = None,
+    type_filters: list[str] | None = None,
+    error_filter: str = "all",  # "all", "no_errors", "only_errors"
+    filter_by_user_email: str | None = None,
+    max_scanned: int = 1000,
+) -> tuple[list[MediaItem], tuple[str, str] | None]:
+    """Fetches the next page of filtered media, newest first, using a cursor.
+
+    Unlike `get_media_for_page`, which re-reads and re-filters everything up
+    to the requested page, this resumes the scan, ordered by timestamp and
+    then document ID, right after `start_after` and stops as soon as the page
+    is full. Filters are still applied client-side, so no composite indexes
+    are needed; at most `max_scanned` documents are read per call, so a page
+    can come back short, or empty, while a cursor remains.
+
+    Args:
+        media_per_page: The number of media items to return.
+        start_after: The cursor returned by the previous call, as the ISO
+            timestamp and ID of the last document scanned, or None for the
+            first page.
+        type_filters: A list of media types to filter by.
+        error_filter: The error filter to apply.
+        filter_by_user_email: Only return media created by this user.
+        max_scanned: The most documents to read in this call.
+
+    Returns:
+        The page of MediaItem objects and the cursor for the next call, which
+        is None once the collection is exhausted.
+
+    Raises:
+        Exception: If Firestore could not be queried.
+    """
+    collection = db.collection(config.GENMEDIA_COLLECTION_NAME)
+    query = collection.order_by(
+        "timestamp", direction=firestore.Query.DESCENDING
+    ).order_by(firestore.FieldPath.document_id(), direction=firestore.Query.DESCENDING)
+    if start_after:
+        timestamp, doc_id = start_after
+        query = query.start_after(
+            {
+                "timestamp": datetime.datetime.fromisoformat(timestamp),
+                firestore.FieldPath.document_id(): collection.document(doc_id),
+            }
+        )
+
+    try:
+        media_items: list[MediaItem] = []
+        cursor = None
+        scanned = 0
+        for doc in query.limit(max_scanned).stream():
+            scanned += 1
+            raw_item_data = doc.to_dict()
+            # Ordering by timestamp only returns documents that have one.
+            cursor = (raw_item_data["timestamp"].isoformat(), doc.id)
+            if not _passes_media_filters(
+                raw_item_data, type_filters, error_filter, filter_by_user_email
+            ):
+                continue
+            media_item = _create_media_item_from_dict(doc.id, raw_item_data)
+            if media_item:
+                media_items.append(media_item)
+            if len(media_items) >= media_per_page:
+                return media_items, cursor
+
+        # A short scan means the collection ran out before the page filled.
+        return media_items, cursor if scanned >= max_scanned else None
+
+    except Exception as e:
+        logger.error(f"Error fetching media page from Firestore: {e}")
+        raise
+
+
 def get_media_for_page_optimized(
     page_size: int,
     type_filters: list[str],
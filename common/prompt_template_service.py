@@ -15,7 +15,9 @@
 """Service for managing Prompt Templates."""
 
 import json
+import os
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
@@ -40,6 +42,33 @@ class PromptTemplate(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+@lru_cache(maxsize=8)
+def _load_templates_from_json_cached(
+    path: str, template_type: str, mtime_ns: int
+) -> tuple[PromptTemplate, ...]:
+    """Parses default templates of one type from a JSON file.
+
+    `mtime_ns` is only part of the cache key, so an edited file is re-read.
+    """
+    templates = []
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+            for item in data:
+                # Ensure the template matches the expected type for this context
+                if item.get("template_type") == template_type:
+                    templates.append(PromptTemplate(**item, is_default=True))
+    except FileNotFoundError:
+        print(f"Warning: Prompt template file not found at {path}")
+    except json.JSONDecodeError:
+        print(f"Warning: Could not decode JSON from {path}")
+    except Exception as e:
+        print(
+            f"Warning: An unexpected error occurred loading templates from {path}: {e}"
+        )
+    return tuple(templates)
+
+
 class PromptTemplateService:
     """Service for managing Prompt Templates."""
 
@@ -47,24 +76,19 @@ class PromptTemplateService:
         self.collection_name = collection_name
 
     def _load_from_json(self, path: str, template_type: str) -> list[PromptTemplate]:
-        """Loads a list of default templates from a JSON file."""
-        templates = []
+        """Loads a list of default templates from a JSON file.
+
+        Parsed files are cached per modification time, so repeat page loads skip
+        the file read and validation until the file changes on disk.
+        """
         try:
-            with open(path, "r") as f:
-                data = json.load(f)
-                for item in data:
-                    # Ensure the template matches the expected type for this context
-                    if item.get("template_type") == template_type:
-                        templates.append(PromptTemplate(**item, is_default=True))
+            mtime_ns = os.stat(path).st_mtime_ns
         except FileNotFoundError:
             print(f"Warning: Prompt template file not found at {path}")
-        except json.JSONDecodeError:
-            print(f"Warning: Could not decode JSON from {path}")
-        except Exception as e:
-            print(
-                f"Warning: An unexpected error occurred loading templates from {path}: {e}"
-            )
-        return templates
+            return []
+        templates = _load_templates_from_json_cached(path, template_type, mtime_ns)
+        # Hand out copies so callers can't mutate the cached defaults.
+        return [t.model_copy() for t in templates]
 
     def load_templates(
         self, config_path: str, template_type: str
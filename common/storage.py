@@ -15,6 +15,7 @@
 import base64
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
+from typing import BinaryIO
 
 from google.cloud import storage
 
@@ -64,6 +65,24 @@ def get_storage_client() -> storage.Client:
     return _storage_client
 
 
+def warm_up_clients() -> None:
+    """Makes one cheap GCS and Firestore call so credentials and connections are ready.
+
+    Meant to run on a background thread at startup; failures are only logged,
+    since the first real request will retry anyway.
+    """
+    try:
+        if cfg.GENMEDIA_BUCKET:
+            next(iter(get_storage_client().list_blobs(cfg.GENMEDIA_BUCKET, max_results=1)), None)
+    except Exception as e:
+        print(f"GCS client warm-up failed: {e}")
+    try:
+        if db:
+            db.collection(cfg.GENMEDIA_COLLECTION_NAME).limit(1).get()
+    except Exception as e:
+        print(f"Firestore client warm-up failed: {e}")
+
+
 @dataclass
 class Session:
     """Represents a user session."""
@@ -90,15 +109,23 @@ def get_or_create_session(session_id: str, user_email: str) -> Session:
     return session
 
 
+# Chunk size for streamed uploads that are too large for a single multipart request.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
 def store_to_gcs(
     folder: str,
     file_name: str,
     mime_type: str,
-    contents: str | bytes,
+    contents: str | bytes | BinaryIO,
     decode: bool = False,
     bucket_name: str | None = None,
 ):
-    """Store contents to GCS"""
+    """Store contents to GCS.
+
+    `contents` may also be a binary file-like object, which is streamed from
+    its current position instead of being copied into memory first.
+    """
     actual_bucket_name = bucket_name if bucket_name else cfg.GENMEDIA_BUCKET
     if not actual_bucket_name:
         raise ValueError(
@@ -115,6 +142,11 @@ def store_to_gcs(
     if decode:
         contents_bytes = base64.b64decode(contents)
         blob.upload_from_string(contents_bytes, content_type=mime_type)
+    elif hasattr(contents, "read"):
+        blob.chunk_size = UPLOAD_CHUNK_SIZE
+        blob.upload_from_file(
+            contents, content_type=mime_type, size=getattr(contents, "size", None)
+        )
     elif isinstance(contents, bytes):
         blob.upload_from_string(contents, content_type=mime_type)
     else:
@@ -131,6 +163,13 @@ def download_from_gcs(gcs_uri: str) -> bytes:
     return blob.download_as_bytes()
 
 
+def download_range_from_gcs(gcs_uri: str, start: int, end: int) -> bytes:
+    """Downloads bytes `start` through `end` (inclusive) of a GCS object."""
+    client = get_storage_client()
+    blob = storage.Blob.from_string(gcs_uri, client=client)
+    return blob.download_as_bytes(start=start, end=end)
+
+
 def download_from_gcs_as_string(gcs_uri: str):
     """Downloads a file from a GCS URI and returns its content as a string."""
     client = get_storage_client()
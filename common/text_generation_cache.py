@@ -0,0 +1,173 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Firestore-backed cache for generated text, keyed by prompt and media inputs."""
+
+import datetime
+import hashlib
+import threading
+
+import numpy as np
+from google.cloud import firestore
+
+from common.analytics import get_logger
+from common.metadata import config, db
+
+logger = get_logger(__name__)
+
+# Number of recent cache entries loaded into the in-process semantic index.
+SEMANTIC_INDEX_SIZE = 500
+
+_semantic_lock = threading.Lock()
+_semantic_index_loaded = False
+_semantic_entries: list[tuple[np.ndarray, str, str]] = []
+_semantic_lookups = 0
+_semantic_hits = 0
+
+
+def make_cache_key(prompt: str, gcs_uris: list[str], model_id: str) -> str:
+    """Builds a stable cache key from a prompt, its media inputs and the model ID.
+
+    The media URIs are sorted so that the same asset set in a different order
+    hits the same entry.
+    """
+    parts = [prompt, *sorted(gcs_uris), model_id]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def make_media_key(gcs_uris: list[str], model_id: str) -> str:
+    """Builds the key a semantic cache hit must match exactly: media set and model."""
+    return make_cache_key("", gcs_uris, model_id)
+
+
+def get_cached_text(key: str) -> str | None:
+    """Returns the cached text for a key, or None on a miss or expired entry.
+
+    Lookup failures are logged and treated as a miss.
+    """
+    if not db:
+        return None
+    try:
+        doc = db.collection(config.TEXT_GENERATION_CACHE_COLLECTION_NAME).document(key).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict() or {}
+        ts = data.get("ts")
+        max_age = datetime.timedelta(hours=config.TEXT_GENERATION_CACHE_TTL_HOURS)
+        if not ts or ts < datetime.datetime.now(datetime.UTC) - max_age:
+            return None
+        # Entries written before empty responses were skipped count as misses.
+        return data.get("text") or None
+    except Exception as e:
+        logger.warning(f"Could not read text generation cache entry {key}: {e}")
+        return None
+
+
+def set_cached_text(
+    key: str,
+    text: str,
+    embedding: list[float] | None = None,
+    media_key: str | None = None,
+) -> None:
+    """Stores generated text under a key. Write failures are logged and ignored.
+
+    When an embedding and media key are given, the entry is also added to the
+    semantic index so reworded prompts can reuse it. Empty text is never
+    stored, so a blank response is not served as a hit.
+    """
+    if not text or not text.strip():
+        return
+    if embedding is not None and media_key is not None:
+        _add_semantic_entry(embedding, media_key, text)
+    if not db:
+        return
+    entry = {"text": text, "ts": firestore.SERVER_TIMESTAMP}
+    if embedding is not None and media_key is not None:
+        entry["embedding"] = embedding
+        entry["media_key"] = media_key
+    try:
+        db.collection(config.TEXT_GENERATION_CACHE_COLLECTION_NAME).document(key).set(
+            entry,
+        )
+    except Exception as e:
+        logger.warning(f"Could not write text generation cache entry {key}: {e}")
+
+
+def _normalize(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _add_semantic_entry(embedding: list[float], media_key: str, text: str) -> None:
+    with _semantic_lock:
+        _semantic_entries.append((_normalize(embedding), media_key, text))
+        del _semantic_entries[:-SEMANTIC_INDEX_SIZE]
+
+
+def _load_semantic_index() -> None:
+    """Fills the in-process semantic index from the most recent cache entries once."""
+    global _semantic_index_loaded
+    with _semantic_lock:
+        if _semantic_index_loaded:
+            return
+        _semantic_index_loaded = True
+    if not db:
+        return
+    try:
+        query = (
+            db.collection(config.TEXT_GENERATION_CACHE_COLLECTION_NAME)
+            .order_by("ts", direction=firestore.Query.DESCENDING)
+            .limit(SEMANTIC_INDEX_SIZE)
+        )
+        loaded = []
+        for doc in query.stream():
+            data = doc.to_dict() or {}
+            if data.get("embedding") and data.get("media_key") and data.get("text"):
+                loaded.append(
+                    (_normalize(data["embedding"]), data["media_key"], data["text"]),
+                )
+        with _semantic_lock:
+            _semantic_entries[:0] = reversed(loaded)
+            del _semantic_entries[:-SEMANTIC_INDEX_SIZE]
+        logger.info(f"Loaded {len(loaded)} entries into the semantic text cache.")
+    except Exception as e:
+        logger.warning(f"Could not load semantic text cache from Firestore: {e}")
+
+
+def find_similar_cached_text(embedding: list[float], media_key: str) -> str | None:
+    """Returns cached text for the nearest prompt with the same media and model.
+
+    A hit requires a cosine similarity of at least
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD.
+    """
+    global _semantic_lookups, _semantic_hits
+    _load_semantic_index()
+    query = _normalize(embedding)
+    best_text, best_score = None, -1.0
+    with _semantic_lock:
+        for vector, entry_media_key, text in _semantic_entries:
+            if entry_media_key != media_key:
+                continue
+            score = float(np.dot(vector, query))
+            if score > best_score:
+                best_text, best_score = text, score
+        _semantic_lookups += 1
+        hit = best_score >= config.SEMANTIC_CACHE_SIMILARITY_THRESHOLD
+        if hit:
+            _semantic_hits += 1
+        logger.info(
+            f"Semantic text cache {'hit' if hit else 'miss'} "
+            f"(similarity={best_score:.3f}, hit rate {_semantic_hits}/{_semantic_lookups})",
+        )
+    return best_text if hit else None
@@ -40,7 +40,9 @@ def create_display_url(gcs_uri: str) -> str:
     if not gcs_uri or not gcs_uri.startswith("gs://"):
         return ""
 
-    if cfg().USE_MEDIA_PROXY:
+    # Read the class default rather than building a Default() per URL; this
+    # runs once per tile when pages hydrate media lists.
+    if cfg.USE_MEDIA_PROXY:
         # Use the fast, simple proxy URL
         proxy_path = gcs_uri.replace("gs://", "")
         return f"/media/{proxy_path}"
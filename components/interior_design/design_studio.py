@@ -16,9 +16,11 @@ def design_studio(
     is_designing: bool,
     on_upload_design_image: Callable,
     on_select_design_image: Callable,
-    on_design_prompt_input: Callable, # Changed from on_blur
+    design_prompt: str,
+    on_design_prompt_blur: Callable,
     on_clear_design: Callable,
     on_design_click: Callable,
+    is_uploading_design_image: bool = False,
 ):
     """
     Component for the Design Studio.
@@ -43,15 +45,17 @@ def design_studio(
                 on_library_select=on_select_design_image,
                 button_label="Add from Library",
             )
-        if design_image_display_url:
+        if is_uploading_design_image:
+            me.progress_spinner(diameter=24)
+        elif design_image_display_url:
             me.image(
                 src=design_image_display_url,
                 style=me.Style(width="100%", border_radius=8, margin=me.Margin(top=8)),
             )
         me.textarea(
             label="Design Modifications",
-            on_input=on_design_prompt_input,
-            value=storyboard_item.get("design_prompt", ""),
+            on_blur=on_design_prompt_blur,
+            value=design_prompt,
             style=me.Style(width="100%"),
         )
         with me.box(style=me.Style(display="flex", flex_direction="row", gap=8)):
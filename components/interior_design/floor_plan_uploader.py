@@ -6,7 +6,6 @@ from typing import Callable
 import mesop as me
 
 from common.storage import store_to_gcs
-from common.utils import create_display_url
 from components.library.events import LibrarySelectionChangeEvent
 from components.library.library_chooser_button import library_chooser_button
 from state.interior_design_v2_state import PageState
@@ -25,6 +24,15 @@ IMAGE_PLACEHOLDER_STYLE = me.Style(
     flex_direction="column",
     gap=8,
 )
+COLUMN_STYLE = me.Style(
+    display="flex", flex_direction="column", gap=10, align_items="center"
+)
+CONTROLS_ROW_STYLE = me.Style(
+    display="flex", flex_direction="row", gap=8, align_items="center", min_height=48
+)
+IMAGE_STYLE = me.Style(
+    height="100%", width="100%", border_radius=8, object_fit="contain"
+)
 
 
 @me.component
@@ -32,28 +40,14 @@ def floor_plan_uploader(
     storyboard: dict,
     on_upload: Callable,
     on_library_select: Callable,
+    is_uploading: bool = False,
 ):
     """
     Component for uploading a floor plan.
     """
-    with me.box(
-        style=me.Style(
-            display="flex",
-            flex_direction="column",
-            gap=10,
-            align_items="center",
-        )
-    ):
+    with me.box(style=COLUMN_STYLE):
         me.text("Floor Plan", type="headline-6")
-        with me.box(
-            style=me.Style(
-                display="flex",
-                flex_direction="row",
-                gap=8,
-                align_items="center",
-                min_height=48,
-            )
-        ):
+        with me.box(style=CONTROLS_ROW_STYLE):
             me.uploader(
                 label="Upload Floor Plan",
                 on_upload=on_upload,
@@ -64,15 +58,12 @@ def floor_plan_uploader(
                 key="floor_plan", on_library_select=on_library_select
             )
         with me.box(style=IMAGE_PLACEHOLDER_STYLE):
-            if storyboard and storyboard.get("original_floor_plan_uri"):
+            if is_uploading:
+                me.progress_spinner()
+            elif storyboard and storyboard.get("original_floor_plan_uri"):
                 me.image(
-                    src=create_display_url(storyboard["original_floor_plan_uri"]),
-                    style=me.Style(
-                        height="100%",
-                        width="100%",
-                        border_radius=8,
-                        object_fit="contain",
-                    ),
+                    src=storyboard.get("original_floor_plan_display_url", ""),
+                    style=IMAGE_STYLE,
                 )
             else:
                 me.icon("floorplan")
@@ -5,8 +5,6 @@ Component for generating and displaying the 3D view.
 from typing import Callable
 import mesop as me
 
-from common.utils import create_display_url
-
 
 IMAGE_PLACEHOLDER_STYLE = me.Style(
     width=400,
@@ -21,6 +19,15 @@ IMAGE_PLACEHOLDER_STYLE = me.Style(
     flex_direction="column",
     gap=8,
 )
+COLUMN_STYLE = me.Style(
+    display="flex", flex_direction="column", gap=10, align_items="center"
+)
+CONTROLS_ROW_STYLE = me.Style(
+    display="flex", flex_direction="row", gap=8, align_items="center", min_height=48
+)
+IMAGE_STYLE = me.Style(
+    height="100%", width="100%", border_radius=8, object_fit="contain"
+)
 
 
 @me.component
@@ -32,24 +39,9 @@ def generated_3d_view(
     """
     Component for generating and displaying the 3D view.
     """
-    with me.box(
-        style=me.Style(
-            display="flex",
-            flex_direction="column",
-            gap=10,
-            align_items="center",
-        )
-    ):
+    with me.box(style=COLUMN_STYLE):
         me.text("Generated 3D View", type="headline-6")
-        with me.box(
-            style=me.Style(
-                display="flex",
-                flex_direction="row",
-                gap=8,
-                align_items="center",
-                min_height=48,
-            )
-        ):
+        with me.box(style=CONTROLS_ROW_STYLE):
             me.button(
                 "Generate 3D View",
                 on_click=on_generate,
@@ -61,13 +53,8 @@ def generated_3d_view(
                 me.progress_spinner()
             elif storyboard and storyboard.get("generated_3d_view_uri"):
                 me.image(
-                    src=create_display_url(storyboard["generated_3d_view_uri"]),
-                    style=me.Style(
-                        height="100%",
-                        width="100%",
-                        border_radius=8,
-                        object_fit="contain",
-                    ),
+                    src=storyboard.get("generated_3d_view_display_url", ""),
+                    style=IMAGE_STYLE,
                 )
             else:
                 me.icon("view_in_ar")
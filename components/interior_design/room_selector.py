@@ -6,34 +6,47 @@ from typing import Callable
 import mesop as me
 
 
+COLUMN_STYLE = me.Style(
+    display="flex", flex_direction="column", align_items="center", gap=10
+)
+BUTTONS_ROW_STYLE = me.Style(
+    display="flex",
+    flex_direction="row",
+    gap=10,
+    flex_wrap="wrap",
+    justify_content="center",
+)
+
+
 @me.component
 def room_selector(
-    storyboard: dict,
-    is_generating_zoom: bool,
+    room_names: list[str],
+    generating_rooms: list[str],
     on_room_select: Callable,
+    on_generate_all: Callable,
 ):
     """
     Component for selecting a room.
+
+    Takes only the room names and the rooms being generated, so the buttons
+    don't depend on the rest of the page state.
     """
-    if storyboard and storyboard.get("room_names"):
-        print(f"room_selector: Rendering buttons for rooms: {storyboard.get('room_names')}")
-        with me.box(
-            style=me.Style(
-                display="flex",
-                flex_direction="column",
-                align_items="center",
-                gap=10,
-            )
-        ):
-            me.text("Identified Rooms", type="headline-6")
-            with me.box(
-                style=me.Style(
-                    display="flex",
-                    flex_direction="row",
-                    gap=10,
-                    flex_wrap="wrap",
-                    justify_content="center",
-                )
-            ):
-                for room in storyboard["room_names"]:
-                    me.text(f"TEST: {room}")
\ No newline at end of file
+    if not room_names:
+        return
+    with me.box(style=COLUMN_STYLE):
+        me.text("Identified Rooms", type="headline-6")
+        with me.box(style=BUTTONS_ROW_STYLE):
+            for room in room_names:
+                with me.content_button(
+                    key=room, on_click=on_room_select, type="stroked"
+                ):
+                    if room in generating_rooms:
+                        me.progress_spinner(diameter=18)
+                    else:
+                        me.text(room)
+        me.button(
+            "Generate All Rooms",
+            on_click=on_generate_all,
+            type="flat",
+            disabled=bool(generating_rooms),
+        )
@@ -6,7 +6,7 @@ import mesop as me
 
 
 @me.component
-def room_view(storyboard: dict, is_generating_zoom: bool):
+def room_view(storyboard_item: dict | None, is_generating_zoom: bool):
     """
     Component for displaying the room view.
     """
@@ -19,7 +19,6 @@ def room_view(storyboard: dict, is_generating_zoom: bool):
             flex_grow=1,
         )
     ):
-        storyboard_item = next((item for item in storyboard["storyboard_items"] if item["room_name"] == storyboard["selected_room"]), None)
         if storyboard_item:
             me.text(f"Room View: {storyboard_item['room_name']}", type="headline-6")
             if is_generating_zoom:
@@ -21,3 +21,5 @@ class LibrarySelectionChangeEvent:
 
     gcs_uri: str
     chooser_id: str = ""
+    # Resolution stored with the library item, when the selector knows it.
+    resolution: str | None = None
@@ -27,11 +27,16 @@ def library_image_selector(
     media_items: List[MediaItem],
 ):
     """A component that displays a grid of recent media items from the library."""
+    resolutions = {item.primary_uri: item.resolution for item in media_items}
 
     def on_media_click(e: me.WebEvent):
         """Handles the click event on a media tile."""
         print(f"Media Clicked. URI from key: {e.key}")
-        yield from on_select(LibrarySelectionChangeEvent(gcs_uri=e.key))
+        yield from on_select(
+            LibrarySelectionChangeEvent(
+                gcs_uri=e.key, resolution=resolutions.get(e.key)
+            )
+        )
 
     with me.box(
         style=me.Style(
@@ -46,7 +51,7 @@ def library_image_selector(
             for item in media_items:
                 # The signed_url attribute is now added by the parent component.
                 https_url = item.signed_url if hasattr(item, "signed_url") else ""
-                gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
+                gcs_uri = item.primary_uri
 
                 # Explicitly determine render type for the tile if possible
                 render_type = item.media_type
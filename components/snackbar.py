@@ -1,13 +1,23 @@
 import mesop as me
 from typing import Callable
 
+from components.snackbar_timer.snackbar_timer import snackbar_timer
+
 @me.component
 def snackbar(
   *,
   is_visible: bool,
   label: str,
+  on_dismiss: Callable[[me.WebEvent], None] | None = None,
+  duration_ms: int = 3000,
 ):
-  """Creates a simple snackbar."""
+  """Creates a simple snackbar.
+
+  When `on_dismiss` is given, the snackbar calls it `duration_ms` after it is
+  shown, using a client-side timer instead of sleeping in the event handler.
+  """
+  if is_visible and on_dismiss:
+    snackbar_timer(duration_ms=duration_ms, label=label, on_elapsed=on_dismiss)
   with me.box(
     style=me.Style(
       display="block" if is_visible else "none",
@@ -0,0 +1,54 @@
+import { LitElement, html } from "https://cdn.jsdelivr.net/npm/lit/+esm";
+
+class SnackbarTimer extends LitElement {
+  static get properties() {
+    return {
+      durationMs: { type: Number },
+      label: { type: String },
+      elapsed: { type: String }, // Event handler ID
+    };
+  }
+
+  constructor() {
+    super();
+    this.durationMs = 3000;
+    this.label = "";
+    this.elapsed = "";
+    this.timeout = null;
+  }
+
+  updated(changedProperties) {
+    // Restart the countdown when a new message is shown while still visible.
+    if (changedProperties.has("label") || changedProperties.has("durationMs")) {
+      this.startTimer();
+    }
+  }
+
+  disconnectedCallback() {
+    super.disconnectedCallback();
+    this.clearTimer();
+  }
+
+  startTimer() {
+    this.clearTimer();
+    this.timeout = setTimeout(() => {
+      this.timeout = null;
+      if (this.elapsed) {
+        this.dispatchEvent(new MesopEvent(this.elapsed, {}));
+      }
+    }, this.durationMs);
+  }
+
+  clearTimer() {
+    if (this.timeout) {
+      clearTimeout(this.timeout);
+      this.timeout = null;
+    }
+  }
+
+  render() {
+    return html``; // Invisible; only keeps time.
+  }
+}
+
+customElements.define("snackbar-timer", SnackbarTimer);
@@ -0,0 +1,44 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Python wrapper for the Snackbar Timer Lit component."""
+
+import typing
+
+import mesop as me
+
+
+@me.web_component(path="./snackbar_timer.js")
+def snackbar_timer(
+    *,
+    duration_ms: int,
+    on_elapsed: typing.Callable[[me.WebEvent], None],
+    label: str = "",
+    key: str | None = None,
+):
+    """Fires `on_elapsed` once `duration_ms` after being rendered or after `label` changes.
+
+    The countdown runs in the browser, so no server worker is held while waiting.
+    """
+    return me.insert_web_component(
+        key=key,
+        name="snackbar-timer",
+        properties={
+            "durationMs": duration_ms,
+            "label": label,
+        },
+        events={
+            "elapsed": on_elapsed,
+        },
+    )
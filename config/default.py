@@ -94,6 +94,10 @@ class Default:
         "GEMINI_WRITERS_WORKSHOP_MODEL_ID",
         MODEL_ID,
     )
+    TEXT_EMBEDDING_MODEL_ID: str = os.environ.get(
+        "TEXT_EMBEDDING_MODEL_ID",
+        "text-embedding-005",
+    )
     GEMINI_CRITIQUE_MODEL_ID: str = os.environ.get(
         "GEMINI_CRITIQUE_MODEL_ID",
         "gemini-3-flash-preview",
@@ -113,6 +117,19 @@ class Default:
         "SESSIONS_COLLECTION_NAME",
         "sessions",
     )
+    TEXT_GENERATION_CACHE_COLLECTION_NAME: str = os.environ.get(
+        "TEXT_GENERATION_CACHE_COLLECTION_NAME",
+        "writers_cache",
+    )
+    TEXT_GENERATION_CACHE_TTL_HOURS: int = int(
+        os.environ.get("TEXT_GENERATION_CACHE_TTL_HOURS", 24),
+    )
+    SEMANTIC_CACHE_ENABLED: bool = (
+        os.environ.get("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    )
+    SEMANTIC_CACHE_SIMILARITY_THRESHOLD: float = float(
+        os.environ.get("SEMANTIC_CACHE_SIMILARITY_THRESHOLD", 0.9),
+    )
 
     # storage
     GENMEDIA_BUCKET: str = os.environ.get("GENMEDIA_BUCKET", f"{PROJECT_ID}-assets")
@@ -219,6 +236,13 @@ class Default:
     IMAGEN_PROMPTS_JSON = "prompts/imagen_prompts.json"
 
     USE_MEDIA_PROXY: bool = os.environ.get("USE_MEDIA_PROXY", "true").lower() == "true"
+    UPSCALE_SPECULATIVE_ENABLED: bool = (
+        os.environ.get("UPSCALE_SPECULATIVE_ENABLED", "false").lower() == "true"
+    )
+    GUIDELINE_SPECULATIVE_CRITERIA_ENABLED: bool = (
+        os.environ.get("GUIDELINE_SPECULATIVE_CRITERIA_ENABLED", "false").lower()
+        == "true"
+    )
 
     # Interior Design
     INTERIOR_DESIGN_VIDEO_MODEL: str = os.environ.get(
@@ -232,6 +256,9 @@ class Default:
     INTERIOR_DESIGN_VIDEO_DURATION: int = int(
         os.environ.get("INTERIOR_DESIGN_VIDEO_DURATION", 6),
     )
+    INTERIOR_DESIGN_PREFETCH_ROOMS: bool = (
+        os.environ.get("INTERIOR_DESIGN_PREFETCH_ROOMS", "false").lower() == "true"
+    )
 
     # Object Rotation
     OBJECT_ROTATION_VIDEO_MODEL: str = os.environ.get(
@@ -16,6 +16,7 @@
 import datetime
 import inspect
 import os
+import threading
 import uuid
 
 try:
@@ -75,6 +76,7 @@ from common.identity import (
     get_authenticated_user_email,
 )
 from common.prompt_template_service import PromptTemplate
+from common.storage import warm_up_clients
 from common.utils import create_display_url
 from config import default as config
 from models.video_processing import convert_mp4_to_gif
@@ -300,6 +302,9 @@ me.page(path="/test_svg", title="Test SVG")(test_svg_page)
 me.page(path="/test_media_chooser", title="Test Media Chooser")(test_media_chooser_page)
 me.page(path="/test_async_veo", title="Test Async Veo")(test_async_veo_page)
 
+# Fetch credentials and open connections before the first user needs them.
+threading.Thread(target=warm_up_clients, daemon=True).start()
+
 # Global storage client instance to reuse connections
 _proxy_storage_client = None
 
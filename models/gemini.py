@@ -16,7 +16,8 @@
 import json
 import time
 import uuid
-from typing import Any, Optional
+from pathlib import PurePosixPath
+from typing import Any, Iterator, Optional
 
 import requests
 from google.cloud.aiplatform import telemetry
@@ -92,6 +93,24 @@ cfg = Default()  # Instantiate config
 cc_client = GeminiModelSetup.init(location=cfg.CHARACTER_CONSISTENCY_GEMINI_LOCATION)
 REWRITER_MODEL_ID = cfg.MODEL_ID  # Use default model from config for rewriter
 
+_VIDEO_EXTS = frozenset({".mp4", ".mov", ".avi", ".mkv", ".webm"})
+_AUDIO_EXTS = frozenset({".wav", ".mp3", ".flac"})
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".webp", ".gif"})
+
+
+def _guess_mime_type(uri: str, default: str) -> str:
+    """Maps a media URI to the general mime type sent to Gemini, by extension."""
+    suffix = PurePosixPath(uri.lower()).suffix
+    if suffix in _VIDEO_EXTS:
+        return "video/mp4"  # General video type
+    if suffix in _AUDIO_EXTS:
+        return "audio/wav"  # General audio type
+    if suffix in _IMAGE_EXTS:
+        return "image/png"  # General image type
+    if suffix == ".pdf":
+        return "application/pdf"
+    return default
+
 
 def generate_image_from_prompt_and_images(
     prompt: str,
@@ -114,24 +133,7 @@ def generate_image_from_prompt_and_images(
 
     parts = [types.Part.from_text(text=prompt)]
     for image_uri in images:
-        # More robust mime type detection
-        if any(
-            image_uri.lower().endswith(ext)
-            for ext in [".mp4", ".mov", ".avi", ".mkv", ".webm"]
-        ):
-            mime_type = "video/mp4"  # General video type
-        elif any(image_uri.lower().endswith(ext) for ext in [".wav", ".mp3", ".flac"]):
-            mime_type = "audio/wav"  # General audio type
-        elif any(
-            image_uri.lower().endswith(ext)
-            for ext in [".png", ".jpg", ".jpeg", ".webp", ".gif"]
-        ):
-            mime_type = "image/png"  # General image type
-        elif image_uri.lower().endswith(".pdf"):
-            mime_type = "application/pdf"
-        else:
-            # Fallback for unknown types
-            mime_type = "image/png"
+        mime_type = _guess_mime_type(image_uri, default="image/png")
         parts.append(types.Part.from_uri(file_uri=image_uri, mime_type=mime_type))
 
     contents = [types.Content(role="user", parts=parts)]
@@ -1181,6 +1183,16 @@ def generate_critique_questions(
     return [q.question for q in question_list.questions]
 
 
+def _build_text_contents(prompt: str, images: list[str]) -> list[types.Content]:
+    """Builds the user content for a text generation request."""
+    parts = [types.Part.from_text(text=prompt)]
+    for image_uri in images:
+        # Fallback for unknown types, though this may still cause errors
+        mime_type = _guess_mime_type(image_uri, default="application/octet-stream")
+        parts.append(types.Part.from_uri(file_uri=image_uri, mime_type=mime_type))
+    return [types.Content(role="user", parts=parts)]
+
+
 @retry(
     wait=wait_exponential(multiplier=1, min=1, max=10),
     stop=stop_after_attempt(3),
@@ -1198,32 +1210,7 @@ def generate_text(
     if not model_name:
         model_name = cfg.MODEL_ID
 
-    parts = [types.Part.from_text(text=prompt)]
-    for image_uri in images:
-        # More robust mime type detection
-        if any(
-            image_uri.lower().endswith(ext)
-            for ext in [".mp4", ".mov", ".avi", ".mkv", ".webm"]
-        ):
-            mime_type = "video/mp4"  # General video type
-        elif any(image_uri.lower().endswith(ext) for ext in [".wav", ".mp3", ".flac"]):
-            mime_type = "audio/wav"  # General audio type
-        elif any(
-            image_uri.lower().endswith(ext)
-            for ext in [".png", ".jpg", ".jpeg", ".webp", ".gif"]
-        ):
-            mime_type = "image/png"  # General image type
-        elif image_uri.lower().endswith(".pdf"):
-            mime_type = "application/pdf"
-        else:
-            # Fallback for unknown types, though this may still cause errors
-            mime_type = "application/octet-stream"
-
-        parts.append(types.Part.from_uri(file_uri=image_uri, mime_type=mime_type))
-
-    # print(f"Constructed parts for Gemini API: {parts}")
-
-    contents = [types.Content(role="user", parts=parts)]
+    contents = _build_text_contents(prompt, images)
 
     client = GeminiModelSetup.init(
         location=cfg.LOCATION,
@@ -1245,6 +1232,54 @@ def generate_text(
     return response.text, execution_time
 
 
+@retry(
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception_type(Exception),
+    reraise=True,
+)
+def embed_text(text: str) -> list[float]:
+    """Returns the embedding vector for a piece of text."""
+    model_name = cfg.TEXT_EMBEDDING_MODEL_ID
+    with track_model_call(model_name=model_name, task="embed_text"):
+        response = client.models.embed_content(
+            model=model_name,
+            contents=[text],
+        )
+    return list(response.embeddings[0].values)
+
+
+def generate_text_stream(
+    prompt: str,
+    images: list[str],
+    model_name: Optional[str] = None,
+) -> Iterator[str]:
+    """Generates text from a prompt and media files, yielding text chunks as they arrive.
+
+    Unlike generate_text this is not retried, since chunks may already have
+    been shown to the user.
+    """
+    if not model_name:
+        model_name = cfg.MODEL_ID
+
+    contents = _build_text_contents(prompt, images)
+    client = GeminiModelSetup.init(
+        location=cfg.LOCATION,
+    )
+
+    with track_model_call(
+        model_name=model_name,
+        task="generate_text_stream",
+        prompt_length=len(prompt),
+    ):
+        for chunk in client.models.generate_content_stream(
+            model=model_name,
+            contents=contents,
+        ):
+            if chunk.text:
+                yield chunk.text
+
+
 class TTSEvaluation(BaseModel):
     quality_score: int = Field(
         ...,
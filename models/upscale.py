@@ -14,38 +14,107 @@
 
 """Upscale model integration."""
 
+import hashlib
 import io
+import threading
 import uuid
 from typing import Tuple
 from PIL import Image
 from google import genai
 from google.genai import types
 from config.default import Default
-from common.storage import store_to_gcs, download_from_gcs
+from common.storage import download_from_gcs, download_range_from_gcs, store_to_gcs
 
 cfg = Default()
 
 UPSCALE_MODEL = "imagen-4.0-upscale-preview"
 
+# Known resolutions keyed by GCS URI or content digest, so repeat selections
+# and re-uploads skip the download and decode. Oldest entries are evicted first.
+MAX_CACHED_RESOLUTIONS = 256
+# Leading byte ranges tried before downloading a whole object to read its
+# size. PNG and WebP headers fit in the first; JPEGs with large EXIF or ICC
+# blocks may push the frame header further in.
+_HEADER_READ_SIZES = (64 * 1024, 256 * 1024)
+_resolution_cache: dict[str, str] = {}
+_resolution_cache_lock = threading.Lock()
+
+
+def remember_image_resolution(key: str, resolution: str) -> None:
+    """Records a known resolution for a GCS URI or content digest."""
+    if not resolution or resolution == "Unknown":
+        return
+    with _resolution_cache_lock:
+        _resolution_cache[key] = resolution
+        while len(_resolution_cache) > MAX_CACHED_RESOLUTIONS:
+            del _resolution_cache[next(iter(_resolution_cache))]
+
+
+def _resolution_cache_key(image_data: bytes | str) -> str | None:
+    if isinstance(image_data, str):
+        return image_data
+    if isinstance(image_data, bytes):
+        return hashlib.blake2b(image_data, digest_size=16).hexdigest()
+    return None
+
+
+def _resolution_from_bytes(image_bytes: bytes) -> str:
+    # Image.open only parses the header; pixel data is never decoded here.
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        return f"{img.width}x{img.height}"
+
+
+def _resolution_from_gcs(gcs_uri: str) -> str:
+    """Reads just enough of a GCS object to parse its size, falling back to a full download."""
+    for size in _HEADER_READ_SIZES:
+        header = download_range_from_gcs(gcs_uri, 0, size - 1)
+        try:
+            return _resolution_from_bytes(header)
+        except Exception:
+            if len(header) < size:
+                # That was the whole object; a larger read won't help.
+                raise
+    return _resolution_from_bytes(download_from_gcs(gcs_uri))
+
+
+def get_upload_resolution(file: io.BytesIO) -> str:
+    """Gets the resolution of an in-memory upload from its leading bytes.
+
+    Reads only as much of the buffer as the header needs instead of copying
+    the whole upload.
+    """
+    with file.getbuffer() as buffer:
+        for size in _HEADER_READ_SIZES:
+            if len(buffer) <= size:
+                break
+            try:
+                return _resolution_from_bytes(bytes(buffer[:size]))
+            except Exception:
+                continue
+        return get_image_resolution(bytes(buffer))
+
+
 def get_image_resolution(image_data: bytes | str) -> str:
     """Gets the resolution of an image from GCS URI or bytes."""
-    if isinstance(image_data, str) and image_data.startswith("gs://"):
-        try:
-            image_bytes = download_from_gcs(image_data)
-        except Exception as e:
-            print(f"Error downloading image for resolution check: {e}")
-            return "Unknown"
-    elif isinstance(image_data, bytes):
-        image_bytes = image_data
-    else:
-        return "Unknown"
-        
+    cache_key = _resolution_cache_key(image_data)
+    if cache_key:
+        with _resolution_cache_lock:
+            cached = _resolution_cache.get(cache_key)
+        if cached:
+            return cached
+
     try:
-        with Image.open(io.BytesIO(image_bytes)) as img:
-            return f"{img.width}x{img.height}"
+        if isinstance(image_data, str) and image_data.startswith("gs://"):
+            resolution = _resolution_from_gcs(image_data)
+        elif isinstance(image_data, bytes):
+            resolution = _resolution_from_bytes(image_data)
+        else:
+            return "Unknown"
     except Exception as e:
         print(f"Error getting resolution: {e}")
         return "Unknown"
+    remember_image_resolution(cache_key, resolution)
+    return resolution
 
 def upscale_image(input_gcs_uri: str, upscale_factor: str) -> Tuple[str, str, str]:
     """
@@ -99,5 +168,6 @@ def upscale_image(input_gcs_uri: str, upscale_factor: str) -> Tuple[str, str, st
         mime_type="image/png",
         contents=image_data,
     )
+    remember_image_resolution(output_gcs_uri, upscaled_resolution)
 
     return output_gcs_uri, original_resolution, upscaled_resolution
@@ -16,8 +16,10 @@ import datetime
 import logging
 import math
 import os
+import subprocess
 import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import moviepy
@@ -33,6 +35,7 @@ from moviepy import (
     vfx,
 )
 from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.config import FFMPEG_BINARY
 from scipy.ndimage import gaussian_filter
 
 from common.metadata import MediaItem, add_media_item_to_firestore
@@ -41,20 +44,34 @@ from config.default import Default
 
 config = Default()
 
+MAX_PARALLEL_DOWNLOADS = 8
+# Container timestamps can round a joined file slightly short of the sum of
+# its parts; anything shorter than this means clips were dropped.
+STREAM_COPY_DURATION_TOLERANCE = 0.5
+
 
 def _download_videos_to_temp(video_gcs_uris: list[str], tmpdir: str) -> list[str]:
-    """Downloads videos from GCS to a temporary directory."""
-    local_video_paths = []
-    for i, gcs_uri in enumerate(video_gcs_uris):
+    """Downloads videos from GCS to a temporary directory.
+
+    Downloads run in parallel; the returned paths follow the input order.
+    """
+
+    def download(index: int, gcs_uri: str) -> str:
         video_bytes = download_from_gcs(gcs_uri)
         base_name = os.path.basename(gcs_uri)
-        unique_local_filename = f"{i}_{base_name}"
+        unique_local_filename = f"{index}_{base_name}"
         local_filename = os.path.join(tmpdir, unique_local_filename)
         with open(local_filename, "wb") as f:
             f.write(video_bytes)
-        local_video_paths.append(local_filename)
         print(f"Downloaded {gcs_uri} to {local_filename}")
-    return local_video_paths
+        return local_filename
+
+    if len(video_gcs_uris) == 1:
+        return [download(0, video_gcs_uris[0])]
+    with ThreadPoolExecutor(
+        max_workers=min(MAX_PARALLEL_DOWNLOADS, len(video_gcs_uris))
+    ) as pool:
+        return list(pool.map(download, range(len(video_gcs_uris)), video_gcs_uris))
 
 
 def _upload_to_gcs(local_path: str, destination_folder: str, mime_type: str) -> str:
@@ -83,6 +100,63 @@ def _upload_to_gcs(local_path: str, destination_folder: str, mime_type: str) ->
 print(f"DEBUG: Loading video_processing.py at {datetime.datetime.now()}. Moviepy version: {moviepy.__version__}")
 
 
+def _can_stream_copy(clips) -> bool:
+    """Whether clips share the frame size, frame rate and audio layout a stream copy needs."""
+    first = clips[0]
+    return all(
+        clip.size == first.size
+        and clip.fps == first.fps
+        and (clip.audio is None) == (first.audio is None)
+        for clip in clips[1:]
+    )
+
+
+def _concat_stream_copy(local_paths: list[str], clips, output_path: str) -> bool:
+    """Joins clips with ffmpeg's concat demuxer, copying streams without re-encoding.
+
+    Returns False when ffmpeg rejects the inputs or the result comes out short,
+    so the caller can fall back to re-encoding.
+    """
+    list_path = f"{output_path}.txt"
+    with open(list_path, "w") as f:
+        for path in local_paths:
+            escaped = path.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    result = subprocess.run(
+        [
+            FFMPEG_BINARY,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-c",
+            "copy",
+            output_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        logging.warning(f"Stream-copy concat failed, re-encoding: {result.stderr}")
+        return False
+
+    # Mismatched codecs can still produce a file; make sure all of it is there.
+    expected_duration = sum(clip.duration for clip in clips)
+    with VideoFileClip(output_path) as joined:
+        if joined.duration < expected_duration - STREAM_COPY_DURATION_TOLERANCE:
+            logging.warning(
+                f"Stream-copy concat is {joined.duration}s, expected {expected_duration}s; re-encoding."
+            )
+            return False
+    return True
+
+
 def _safe_transition_duration(clip1, clip2, transition_duration):
     """Returns a transition duration that fits inside both clips."""
     transition_duration = float(transition_duration)
@@ -345,6 +419,21 @@ def process_videos(
         if transition != "concat":
             clip2 = _match_clip_size(clip2, clip1.size)
 
+        output_filename = f"processed_{uuid.uuid4()}.mp4"
+        final_clip_path = os.path.join(tmpdir, output_filename)
+
+        if (
+            transition == "concat"
+            and _can_stream_copy(clips)
+            and _concat_stream_copy(local_paths, clips, final_clip_path)
+        ):
+            final_gcs_uri = _upload_to_gcs(
+                final_clip_path, "processed_videos", "video/mp4"
+            )
+            for clip in clips:
+                clip.close()
+            return final_gcs_uri
+
         if transition == "concat":
             final_clip = concatenate_videoclips(clips)
         elif transition == "x-fade":
@@ -356,8 +445,6 @@ def process_videos(
         else:
             final_clip = concatenate_videoclips(clips)  # Default to concat
 
-        output_filename = f"processed_{uuid.uuid4()}.mp4"
-        final_clip_path = os.path.join(tmpdir, output_filename)
         final_clip.write_videofile(final_clip_path, codec="libx264")
 
         final_gcs_uri = _upload_to_gcs(final_clip_path, "processed_videos", "video/mp4")
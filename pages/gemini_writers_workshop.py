@@ -13,15 +13,26 @@
 # limitations under the License.
 """Gemini Writers Workshop - an experimental page for text generation."""
 
+import functools
 import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import field
+from pathlib import PurePosixPath
 
 import mesop as me
 
-from common.analytics import track_click, track_model_call
+from common.analytics import track_click
 from common.prompt_template_service import PromptTemplate, prompt_template_service
 from common.storage import store_to_gcs
+from common.text_generation_cache import (
+    find_similar_cached_text,
+    get_cached_text,
+    make_cache_key,
+    make_media_key,
+    set_cached_text,
+)
 from common.utils import create_display_url
 from components.copy_button.copy_button import copy_button
 from components.dialog import dialog
@@ -32,13 +43,19 @@ from components.page_scaffold import page_frame, page_scaffold
 from components.prompt_template_form_dialog.prompt_template_form_dialog import (
     prompt_template_form_dialog,
 )
+from components.snackbar import snackbar
 from components.svg_icon.svg_icon import svg_icon
 from components.video_thumbnail.video_thumbnail import video_thumbnail
 from config.default import Default as cfg
-from models.gemini import generate_text
+from models.gemini import embed_text, generate_text_stream
 from state.state import AppState
 
 MAX_MEDIA_ASSETS = 3
+TEXT_PROMPT_TEMPLATES_PATH = "config/text_prompt_templates.json"
+TEMPLATES_CACHE_TTL_SECONDS = 60
+
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".webp", ".gif"})
+_VIDEO_EXTS = frozenset({".mp4", ".mov", ".avi", ".webm"})
 
 
 @me.stateclass
@@ -47,6 +64,7 @@ class PageState:
 
     uploaded_media_gcs_uris: list[str] = field(default_factory=list)  # pylint: disable=E3701:invalid-field-call
     uploaded_media_display_urls: list[str] = field(default_factory=list)  # pylint: disable=E3701:invalid-field-call
+    uploaded_media_kinds: list[str] = field(default_factory=list)  # pylint: disable=E3701:invalid-field-call
     prompt: str = ""
     generated_text: str = ""
     is_generating: bool = False
@@ -64,12 +82,54 @@ class PageState:
     show_save_template_dialog: bool = False
 
 
-with open("config/about_content.json") as f:
-    about_content = json.load(f)
-    WRITERS_WORKSHOP_INFO = {
-        "title": "Gemini Writers Workshop",
-        "description": "A place to generate text content from prompts and optional media assets.\n\nUpload an image or video to get a Gemini description, or upload a PDF to extract or analyze information. Use this information to enhance your understanding and create new prompts.",
-    }
+WRITERS_WORKSHOP_INFO = {
+    "title": "Gemini Writers Workshop",
+    "description": "A place to generate text content from prompts and optional media assets.\n\nUpload an image or video to get a Gemini description, or upload a PDF to extract or analyze information. Use this information to enhance your understanding and create new prompts.",
+}
+
+
+def _media_kind(gcs_uri: str) -> str:
+    """Classifies a media URI as "image", "video", "pdf" or "other" by its extension."""
+    suffix = PurePosixPath(gcs_uri.lower()).suffix
+    if suffix in _IMAGE_EXTS:
+        return "image"
+    if suffix in _VIDEO_EXTS:
+        return "video"
+    if suffix == ".pdf":
+        return "pdf"
+    return "other"
+
+
+@functools.lru_cache(maxsize=1)
+def _serialized_prompt_templates(mtime_ns: int, ttl_bucket: int) -> str:
+    """Loads and serializes the text templates.
+
+    Neither argument is read; both only form the cache key. `mtime_ns` re-reads
+    the defaults file when it changes. `ttl_bucket` advances every
+    TEMPLATES_CACHE_TTL_SECONDS and expires the entry, which is how user
+    templates saved to Firestore from other instances get picked up; the file
+    mtime cannot see those.
+    """
+    templates = prompt_template_service.load_templates(
+        config_path=TEXT_PROMPT_TEMPLATES_PATH, template_type="text",
+    )
+    return json.dumps([t.model_dump() for t in templates], default=str)
+
+
+def _prompt_templates_json() -> str:
+    """Returns the text templates as JSON, shared across sessions.
+
+    The cache is keyed on the defaults file mtime and a cache-busting time
+    bucket, so templates saved on other instances appear within
+    TEMPLATES_CACHE_TTL_SECONDS.
+    """
+    try:
+        mtime_ns = os.stat(TEXT_PROMPT_TEMPLATES_PATH).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = 0
+    return _serialized_prompt_templates(
+        mtime_ns, int(time.time() // TEMPLATES_CACHE_TTL_SECONDS),
+    )
 
 
 def open_info_dialog(e: me.ClickEvent):
@@ -91,10 +151,7 @@ def on_load(e: me.LoadEvent):
     if not state.selected_model:
         state.selected_model = cfg().GEMINI_WRITERS_WORKSHOP_MODEL_ID
     if state.prompt_templates_json == "[]":
-        templates = prompt_template_service.load_templates(
-            config_path="config/text_prompt_templates.json", template_type="text",
-        )
-        state.prompt_templates_json = json.dumps([t.model_dump() for t in templates], default=str)
+        state.prompt_templates_json = _prompt_templates_json()
     yield
 
 
@@ -174,11 +231,8 @@ def on_save_template(label: str, key: str, category: str, prompt: str):
 
         # Reload templates
 
-        templates = prompt_template_service.load_templates(
-            config_path="config/text_prompt_templates.json", template_type="text",
-        )
-
-        state.prompt_templates_json = json.dumps([t.model_dump() for t in templates], default=str)
+        _serialized_prompt_templates.cache_clear()
+        state.prompt_templates_json = _prompt_templates_json()
 
         # Close dialog
 
@@ -273,6 +327,11 @@ def page():
 def gemini_writers_workshop_page_content():
     """Renders the main UI for the Gemini Writers Studio page."""
     state = me.state(PageState)
+    snackbar(
+        is_visible=state.show_snackbar,
+        label=state.snackbar_message,
+        on_dismiss=on_snackbar_dismiss,
+    )
     # Use the new, unified dialog in 'create' mode
     prompt_template_form_dialog(
         # Pass the prompt text in the 'template' dict
@@ -332,7 +391,7 @@ def gemini_writers_workshop_page_content():
                     max_rows=20,
                     autosize=True,
                     on_blur=on_prompt_blur,
-                    value=me.state(PageState).prompt,
+                    value=state.prompt,
                     style=me.Style(width="100%", margin=me.Margin(bottom=2)),
                     appearance="outline",
                 )
@@ -382,12 +441,9 @@ def gemini_writers_workshop_page_content():
                         ):
                             me.icon("save")
 
-                if (
-                    me.state(PageState).generation_complete
-                    and me.state(PageState).generation_time > 0
-                ):
+                if state.generation_complete and state.generation_time > 0:
                     me.text(
-                        f"{me.state(PageState).generation_time:.2f} seconds",
+                        f"{state.generation_time:.2f} seconds",
                         style=me.Style(font_size=12),
                     )
 
@@ -402,7 +458,7 @@ def gemini_writers_workshop_page_content():
                     min_height=400,
                 ),
             ):
-                if me.state(PageState).generated_text:
+                if state.generated_text:
                     with me.box(
                         style=me.Style(
                             display="flex",
@@ -412,9 +468,9 @@ def gemini_writers_workshop_page_content():
                         ),
                     ):
                         me.text("Generated Text", type="headline-6")
-                        copy_button(text_to_copy=me.state(PageState).generated_text)
+                        copy_button(text_to_copy=state.generated_text)
                     me.markdown(
-                        me.state(PageState).generated_text,
+                        state.generated_text,
                         style=me.Style(margin=me.Margin(top=16)),
                     )
                 else:
@@ -454,13 +510,10 @@ def _media_upload_slots():
         for i in range(MAX_MEDIA_ASSETS):
             if i < len(state.uploaded_media_display_urls):
                 display_url = state.uploaded_media_display_urls[i]
-                gcs_uri = state.uploaded_media_gcs_uris[i]
+                media_kind = state.uploaded_media_kinds[i]
 
                 with me.box(style=me.Style(position="relative", width=100, height=100)):
-                    if any(
-                        gcs_uri.lower().endswith(ext)
-                        for ext in [".png", ".jpg", ".jpeg", ".webp", ".gif"]
-                    ):
+                    if media_kind == "image":
                         me.image(
                             src=display_url,
                             style=me.Style(
@@ -470,23 +523,8 @@ def _media_upload_slots():
                                 object_fit="cover",
                             ),
                         )
-                    elif any(
-                        gcs_uri.lower().endswith(ext)
-                        for ext in [".mp4", ".mov", ".avi", ".webm"]
-                    ):
+                    elif media_kind == "video":
                         video_thumbnail(video_src=display_url)
-                    elif gcs_uri.lower().endswith(".pdf"):
-                        with me.box(
-                            style=me.Style(
-                                width=100,
-                                height=100,
-                                border=me.Border.all(me.BorderSide(style="dashed")),
-                                display="flex",
-                                align_items="center",
-                                justify_content="center",
-                            ),
-                        ):
-                            me.icon("article")
                     else:
                         with me.box(
                             style=me.Style(
@@ -616,6 +654,7 @@ def on_media_select(e: LibrarySelectionChangeEvent):
     if len(state.uploaded_media_gcs_uris) < MAX_MEDIA_ASSETS:
         state.uploaded_media_gcs_uris.append(gcs_uri)
         state.uploaded_media_display_urls.append(create_display_url(gcs_uri))
+        state.uploaded_media_kinds.append(_media_kind(gcs_uri))
     else:
         yield from show_snackbar(f"You can add a maximum of {MAX_MEDIA_ASSETS} media assets.")
     yield
@@ -624,18 +663,32 @@ def on_media_select(e: LibrarySelectionChangeEvent):
 # Other event handlers
 def on_upload(e: me.UploadEvent):
     state = me.state(PageState)
-    if len(state.uploaded_media_gcs_uris) < MAX_MEDIA_ASSETS:
-        file = e.files[0]
-        gcs_url = store_to_gcs(
-            "gemini_writers_studio_references",
-            file.name,
-            file.mime_type,
-            file.getvalue(),
-        )
-        state.uploaded_media_gcs_uris.append(gcs_url)
-        state.uploaded_media_display_urls.append(create_display_url(gcs_url))
+    remaining = MAX_MEDIA_ASSETS - len(state.uploaded_media_gcs_uris)
+    if remaining > 0:
+        files = e.files[:remaining]
+        # Upload all selected files concurrently; elapsed time is the slowest upload.
+        with ThreadPoolExecutor(max_workers=MAX_MEDIA_ASSETS) as executor:
+            gcs_urls = list(
+                executor.map(
+                    lambda file: store_to_gcs(
+                        "gemini_writers_studio_references",
+                        file.name,
+                        file.mime_type,
+                        file.getvalue(),
+                    ),
+                    files,
+                ),
+            )
+        for gcs_url in gcs_urls:
+            state.uploaded_media_gcs_uris.append(gcs_url)
+            state.uploaded_media_display_urls.append(create_display_url(gcs_url))
+            state.uploaded_media_kinds.append(_media_kind(gcs_url))
+        if len(e.files) > remaining:
+            yield from show_snackbar(
+                f"You can add a maximum of {MAX_MEDIA_ASSETS} media assets.",
+            )
     else:
-        show_snackbar(f"You can add a maximum of {MAX_MEDIA_ASSETS} media assets.")
+        yield from show_snackbar(f"You can add a maximum of {MAX_MEDIA_ASSETS} media assets.")
     yield
 
 
@@ -645,6 +698,7 @@ def on_remove_media(e: me.ClickEvent):
     if 0 <= index_to_remove < len(state.uploaded_media_gcs_uris):
         del state.uploaded_media_gcs_uris[index_to_remove]
         del state.uploaded_media_display_urls[index_to_remove]
+        del state.uploaded_media_kinds[index_to_remove]
     yield
 
 
@@ -659,6 +713,7 @@ def on_clear_click(e: me.ClickEvent):
     state.prompt = ""
     state.uploaded_media_gcs_uris = []
     state.uploaded_media_display_urls = []
+    state.uploaded_media_kinds = []
     state.generation_time = 0.0
     state.generation_complete = False
     state.previous_media_item_id = None
@@ -670,7 +725,10 @@ def show_snackbar(message: str):
     state.snackbar_message = message
     state.show_snackbar = True
     yield
-    time.sleep(3)
+
+
+def on_snackbar_dismiss(e: me.WebEvent):
+    state = me.state(PageState)
     state.show_snackbar = False
     yield
 
@@ -703,16 +761,39 @@ def _generate_text_and_save(base_prompt: str, input_gcs_uris: list[str]):
     model_id = state.selected_model or cfg().GEMINI_WRITERS_WORKSHOP_MODEL_ID
 
     try:
-        with track_model_call(
-            model_name=model_id, prompt_length=len(base_prompt),
+        cache_key = make_cache_key(base_prompt, input_gcs_uris, model_id)
+        cached_text = get_cached_text(cache_key)
+
+        embedding = None
+        media_key = None
+        if cached_text is None and cfg().SEMANTIC_CACHE_ENABLED:
+            media_key = make_media_key(input_gcs_uris, model_id)
+            try:
+                embedding = embed_text(base_prompt)
+                cached_text = find_similar_cached_text(embedding, media_key)
+            except Exception as ex:
+                print(f"WARNING: Semantic cache lookup failed: {ex}")
+
+        if cached_text is not None:
+            state.generation_time = 0.0
+            state.generated_text = cached_text
+            return
+
+        start_time = time.time()
+        state.generated_text = ""
+        # Show text as it streams in rather than after the full response.
+        # generate_text_stream records the model call itself.
+        for chunk in generate_text_stream(
+            prompt=base_prompt,
+            images=input_gcs_uris,
+            model_name=model_id,
         ):
-            text_result, execution_time = generate_text(
-                prompt=base_prompt,
-                images=input_gcs_uris,
-                model_name=model_id,
-            )
-        state.generation_time = execution_time
-        state.generated_text = text_result
+            state.generated_text += chunk
+            yield
+        state.generation_time = time.time() - start_time
+        set_cached_text(
+            cache_key, state.generated_text, embedding=embedding, media_key=media_key,
+        )
     except Exception as ex:
         print(f"ERROR: Failed to generate text. Details: {ex}")
         state.error_message = f"An error occurred: {ex}"
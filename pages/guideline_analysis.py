@@ -13,13 +13,19 @@
 # limitations under the License.
 """Guideline Analysis page."""
 
-import json
-from dataclasses import asdict, dataclass, field
+import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, replace
+from functools import lru_cache
 from typing import Callable
 
 import mesop as me
 from google.cloud import firestore
 
+from common.analytics import get_logger
 from common.metadata import (
     MediaItem,
     _create_media_item_from_dict,
@@ -33,13 +39,249 @@ from common.utils import create_display_url
 from components.dialog import dialog
 from components.header import header
 from components.library.library_dialog import library_dialog
-from components.media_tile.media_tile import media_tile
+from components.media_tile.media_tile import get_pills_for_item, media_tile
 from components.page_scaffold import page_frame, page_scaffold
 from components.scroll_sentinel.scroll_sentinel import scroll_sentinel
 from models.gemini import describe_image, describe_video, evaluate_media_with_questions
 from models.guideline_analysis import generate_guideline_criteria
 from state.state import AppState
 
+logger = get_logger(__name__)
+
+# Shared pool for per-category criteria evaluation calls.
+EVALUATION_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+CHOOSER_PAGE_SIZE = 20
+# Most chooser items held in state; the ones scrolled past are unloaded first.
+CHOOSER_MAX_ITEMS = 200
+# Fields needed to render a chooser tile and its pills.
+CHOOSER_FIELDS = [
+    "timestamp",
+    "gcsuri",
+    "gcs_uris",
+    "mime_type",
+    "media_type",
+    "model",
+    "mode",
+    "aspect",
+    "duration",
+    "reference_image",
+    "r2v_reference_images",
+    "r2v_style_image",
+]
+# Upper bound on prefetched chooser pages held across all sessions.
+MAX_PREFETCHED_CHOOSER_PAGES = 64
+# How long load-more waits on an in-flight prefetch before querying itself.
+CHOOSER_PREFETCH_WAIT_SECONDS = 5.0
+# How long a prefetched page or remembered cursor stays usable.
+CHOOSER_PREFETCH_TTL_SECONDS = 60.0
+
+# Next chooser pages fetched in the background, keyed by the ID of the
+# document they start after and stamped with when they were fetched. Mesop
+# state can't be written from a worker thread, so the handler picks these up
+# on the next load-more.
+_chooser_prefetch_lock = threading.Lock()
+_chooser_prefetched_pages: dict[str, tuple[float, list["ChooserTile"], firestore.DocumentSnapshot | None]] = {}
+_chooser_prefetch_in_flight: dict[str, threading.Event] = {}
+# Cursor snapshots by document ID, so load-more can resume the query without
+# re-reading the last document it already returned.
+_chooser_cursors: dict[str, tuple[float, firestore.DocumentSnapshot]] = {}
+
+
+# Short-lived cache of selected media items so re-renders during long
+# generate/evaluate spinners don't each re-read the document from Firestore.
+# Entries are shared across sessions, so callers always get a copy.
+ITEM_CACHE_TTL_SECONDS = 5.0
+_item_cache: dict[str, tuple[float, MediaItem]] = {}
+_item_cache_lock = threading.Lock()
+# Firestore writes of freshly uploaded items still in flight, by item ID.
+_pending_item_writes: dict[str, Future] = {}
+
+
+def _get_item_cached(
+    item_id: str, ttl: float = ITEM_CACHE_TTL_SECONDS
+) -> MediaItem | None:
+    now = time.monotonic()
+    with _item_cache_lock:
+        cached = _item_cache.get(item_id)
+        if cached and now - cached[0] < ttl:
+            return replace(cached[1])
+    _await_pending_write(item_id)
+    item = get_media_item_by_id(item_id)
+    with _item_cache_lock:
+        for key in [k for k, (ts, _) in _item_cache.items() if now - ts >= ttl]:
+            del _item_cache[key]
+        if item:
+            _item_cache[item_id] = (now, item)
+    return replace(item) if item else None
+
+
+# Criteria and evaluation results for unchanged inputs, so repeat clicks
+# don't re-run the Gemini calls. Oldest entries are evicted first.
+MAX_CACHED_RESULTS = 128
+_result_cache_lock = threading.Lock()
+_criteria_cache: dict[tuple[str, str], dict[str, list[str]]] = {}
+_evaluation_cache: dict[tuple[str, tuple[str, ...]], dict] = {}
+# Criteria generations still running, so a click can join one started
+# speculatively after a describe instead of issuing it again.
+_criteria_in_flight: dict[tuple[str, str], Future] = {}
+
+
+def _cache_get(cache: dict, key):
+    with _result_cache_lock:
+        return cache.get(key)
+
+
+def _cache_put(cache: dict, key, value) -> None:
+    with _result_cache_lock:
+        cache[key] = value
+        while len(cache) > MAX_CACHED_RESULTS:
+            del cache[next(iter(cache))]
+
+
+def _criteria_future(prompt: str, guidance: str) -> Future:
+    """Returns the in-flight criteria generation for these inputs, starting one if needed."""
+    key = (prompt, guidance)
+    with _result_cache_lock:
+        future = _criteria_in_flight.get(key)
+        if future:
+            return future
+
+        def _run() -> dict[str, list[str]]:
+            try:
+                criteria_result = generate_guideline_criteria(prompt, guidance)
+                if any(criteria_result.values()):
+                    _cache_put(
+                        _criteria_cache,
+                        key,
+                        {k: list(v) for k, v in criteria_result.items()},
+                    )
+                return criteria_result
+            finally:
+                with _result_cache_lock:
+                    _criteria_in_flight.pop(key, None)
+
+        future = EVALUATION_EXECUTOR.submit(_run)
+        _criteria_in_flight[key] = future
+        return future
+
+
+def _evaluate_category(gcs_uri: str, mime_type: str, questions: list[str]) -> dict:
+    """Scores one criteria category against the media, reusing cached results."""
+    key = (gcs_uri, tuple(questions))
+    cached = _cache_get(_evaluation_cache, key)
+    if cached:
+        return cached
+    evaluation_result = evaluate_media_with_questions(
+        media_uri=gcs_uri,
+        mime_type=mime_type,
+        questions=questions,
+    )
+    yes_answers = sum(1 for answer in evaluation_result.answers if answer.answer)
+    evaluation_dict = {
+        "score": f"{yes_answers}/{len(questions)}",
+        "details": [ans.model_dump() for ans in evaluation_result.answers],
+    }
+    _cache_put(_evaluation_cache, key, evaluation_dict)
+    return evaluation_dict
+
+
+def _invalidate_item(item_id: str | None) -> None:
+    if not item_id:
+        return
+    with _item_cache_lock:
+        _item_cache.pop(item_id, None)
+
+
+def _save_new_item_in_background(item: MediaItem) -> Future:
+    """Caches a new item under its client-side ID and writes it off the handler thread.
+
+    Returns the write's future; the pending entry is dropped once it settles,
+    and a failed write also evicts the cached item.
+    """
+    with _item_cache_lock:
+        _item_cache[item.id] = (time.monotonic(), item)
+        future = EVALUATION_EXECUTOR.submit(add_media_item_to_firestore, item)
+        _pending_item_writes[item.id] = future
+
+    def _settle(done: Future) -> None:
+        with _item_cache_lock:
+            _pending_item_writes.pop(item.id, None)
+            if done.exception():
+                _item_cache.pop(item.id, None)
+        if done.exception():
+            logger.error(
+                f"Error saving uploaded media item {item.id}: {done.exception()}"
+            )
+
+    # Registered outside the lock: it runs right away if the write is done.
+    future.add_done_callback(_settle)
+    return future
+
+
+def _await_pending_write(item_id: str) -> bool:
+    """Waits for an in-flight initial write of the item; returns whether it landed."""
+    with _item_cache_lock:
+        future = _pending_item_writes.get(item_id)
+    if not future:
+        return True
+    try:
+        future.result()
+        return True
+    except Exception:
+        return False
+
+
+def _save_item(item: MediaItem) -> None:
+    """Writes an updated item once any pending initial write has landed."""
+    if not _await_pending_write(item.id):
+        raise RuntimeError(f"Media item {item.id} was never saved.")
+    add_media_item_to_firestore(item)
+    _invalidate_item(item.id)
+
+
+_DETAIL_ROW_STYLE = me.Style(
+    display="flex",
+    flex_direction="row",
+    align_items="center",
+    gap=8,
+    margin=me.Margin(bottom=8),
+)
+_PASS_ICON_STYLE = me.Style(color=me.theme_var("success"))
+_FAIL_ICON_STYLE = me.Style(color=me.theme_var("error"))
+_CHOOSER_DIALOG_STYLE = me.Style(
+    width="95vw", height="80vh", display="flex", flex_direction="column"
+)
+_CHOOSER_BODY_STYLE = me.Style(
+    display="flex", flex_direction="column", gap=16, flex_grow=1
+)
+_CHOOSER_HEADER_STYLE = me.Style(
+    display="flex",
+    flex_direction="row",
+    justify_content="space-between",
+    align_items="center",
+    width="100%",
+)
+_CHOOSER_SCROLL_STYLE = me.Style(
+    flex_grow=1, overflow_y="auto", padding=me.Padding.all(10)
+)
+_CHOOSER_GRID_STYLE = me.Style(
+    display="grid",
+    grid_template_columns="repeat(auto-fill, minmax(250px, 1fr))",
+    gap="16px",
+)
+
+
+@dataclass(slots=True)
+class ChooserTile:
+    """The fields a chooser tile renders; full items are re-read on selection."""
+
+    id: str = ""
+    mime_type: str = ""
+    signed_url: str = ""
+    pills_json: str = "[]"
+    render_type: str = "image"
+
 
 @me.stateclass
 class PageState:
@@ -48,16 +290,19 @@ class PageState:
     selected_media_item_id: str | None = None
     additional_guidance: str = ""
     criteria: dict[str, list[str]] = field(default_factory=dict) # pylint: disable=E3701:invalid-field-call
+    is_describing: bool = False
     is_generating_criteria: bool = False
     criteria_error: str | None = None
-    evaluations: dict[str, str] = field(default_factory=dict)  # Store as JSON strings # pylint: disable=E3701:invalid-field-call
+    evaluations: dict[str, dict] = field(default_factory=dict)  # category -> {score, details} # pylint: disable=E3701:invalid-field-call
     is_evaluating: bool = False
     evaluation_error: str | None = None
+    upload_error: str | None = None
     show_chooser_dialog: bool = False
     chooser_is_loading: bool = False
-    chooser_media_items: list[MediaItem] = field(default_factory=list) # pylint: disable=E3701:invalid-field-call
+    chooser_media_items: list[ChooserTile] = field(default_factory=list) # pylint: disable=E3701:invalid-field-call
     chooser_last_doc_id: str = ""
     chooser_all_items_loaded: bool = False
+    chooser_items_unloaded: bool = False
 
 
 @me.page(
@@ -75,6 +320,7 @@ def page():
 def on_clear_click(e: me.ClickEvent):
     state = me.state(PageState)
     state.selected_media_item_id = None
+    state.upload_error = None
     state.criteria = {}
     state.criteria_error = None
     state.evaluations = {}
@@ -93,32 +339,37 @@ def on_describe_item_click(e: me.ClickEvent):
     if not state.selected_media_item_id:
         return
 
-    item = get_media_item_by_id(state.selected_media_item_id)
+    item = _get_item_cached(state.selected_media_item_id)
     if not item:
         return
 
-    gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
+    gcs_uri = item.primary_uri
     if not gcs_uri:
         return
 
-    original_prompt = item.prompt
-    item.prompt = "Generating description..."
-    add_media_item_to_firestore(item)
+    state.is_describing = True
     yield
 
     try:
-        description = ""
         mime_type = item.mime_type or ""
         if mime_type.startswith("video/"):
             description = describe_video(gcs_uri)
         else:
             description = describe_image(gcs_uri)
         item.prompt = description
+        _save_item(item)
+        # Criteria are usually generated next from this description; when
+        # enabled, start them now so the click only waits for whatever is left.
+        if (
+            config.GUIDELINE_SPECULATIVE_CRITERIA_ENABLED
+            and description
+            and not state.criteria
+        ):
+            _criteria_future(description, state.additional_guidance)
     except Exception as ex:
-        item.prompt = original_prompt
-        print(f"Error describing media: {ex}")
+        logger.error(f"Error describing media: {ex}")
     finally:
-        add_media_item_to_firestore(item)
+        state.is_describing = False
         yield
 
 
@@ -132,14 +383,14 @@ def on_evaluate_criteria_click(e: me.ClickEvent):
     state.evaluation_error = None
     yield
 
-    item = get_media_item_by_id(state.selected_media_item_id)
+    item = _get_item_cached(state.selected_media_item_id)
     if not item:
         state.is_evaluating = False
         state.evaluation_error = "Could not find the selected media item."
         yield
         return
 
-    gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
+    gcs_uri = item.primary_uri
     if not gcs_uri:
         state.is_evaluating = False
         state.evaluation_error = "Media item does not have a valid image URI."
@@ -148,22 +399,28 @@ def on_evaluate_criteria_click(e: me.ClickEvent):
 
     new_evaluations = {}
     try:
-        for category, questions in state.criteria.items():
-            if not questions:
-                continue
-            evaluation_result = evaluate_media_with_questions(
-                media_uri=gcs_uri, mime_type=item.mime_type, questions=questions
-            )
-            yes_answers = sum(
-                1 for answer in evaluation_result.answers if answer.answer
-            )
-            score_str = f"{yes_answers}/{len(questions)}"
-            evaluation_dict = {
-                "score": score_str,
-                "details": [ans.model_dump() for ans in evaluation_result.answers],
+        categories = [
+            (category, questions)
+            for category, questions in state.criteria.items()
+            if questions
+        ]
+        # Each category is an independent Gemini call on the same media, so
+        # run them concurrently; latency is the slowest category, not the sum.
+        futures = {
+            EVALUATION_EXECUTOR.submit(
+                _evaluate_category, gcs_uri, item.mime_type, questions
+            ): category
+            for category, questions in categories
+        }
+        # Show each category as soon as it is scored, keeping criteria order.
+        for future in as_completed(futures):
+            new_evaluations[futures[future]] = future.result()
+            state.evaluations = {
+                category: new_evaluations[category]
+                for category, _ in categories
+                if category in new_evaluations
             }
-            new_evaluations[category] = json.dumps(evaluation_dict)
-        state.evaluations = new_evaluations
+            yield
     except Exception as ex:
         error_message = f"An error occurred during evaluation: {ex}"
         print(f"ERROR: {error_message}")
@@ -180,7 +437,7 @@ def page_content():
 
     item = None
     if state.selected_media_item_id:
-        item = get_media_item_by_id(state.selected_media_item_id)
+        item = _get_item_cached(state.selected_media_item_id)
 
     with me.box(style=me.Style(display="flex", flex_direction="row", gap=16)):
         with me.box(
@@ -192,6 +449,11 @@ def page_content():
             )
         ):
             me.text("Select a media asset to analyze")
+            if state.upload_error:
+                me.text(
+                    state.upload_error,
+                    style=me.Style(color=me.theme_var("error")),
+                )
             with me.box(
                 style=me.Style(
                     display="flex", flex_direction="row", align_items="center", gap=16
@@ -205,9 +467,7 @@ def page_content():
             if item:
                 with me.box(style=me.Style(display="flex", flex_direction="row", gap=16)):
                     with me.box(style=me.Style(width="50%")):
-                        display_url = create_display_url(
-                            item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
-                        )
+                        display_url = create_display_url(item.primary_uri)
                         if display_url:
                             mime_type = item.mime_type or ""
                             if mime_type.startswith("video/"):
@@ -219,13 +479,17 @@ def page_content():
 
                     with me.box(style=me.Style(width="50%")):
                         me.text("Prompt:", type="headline-6")
-                        if item.prompt:
+                        if state.is_describing:
+                            me.text("Generating description...")
+                            me.progress_spinner()
+                        elif item.prompt:
                             me.text(item.prompt)
                         else:
                             me.text("No prompt available. You can generate one below.")
                         me.button(
                             "Describe this item",
                             on_click=on_describe_item_click,
+                            disabled=state.is_describing,
                             type="stroked",
                             style=me.Style(margin=me.Margin(top=8)),
                         )
@@ -283,36 +547,22 @@ def page_content():
                         )
 
                     if state.evaluations:
-                        for category, evaluation_json in state.evaluations.items():
-                            evaluation = json.loads(evaluation_json)
+                        for category, evaluation in state.evaluations.items():
                             with me.box(style=me.Style(margin=me.Margin(top=16))):
                                 with me.expansion_panel(
                                     title=f"{category} Score: {evaluation['score']}",
                                     icon="rule",
                                 ):
                                     for detail in evaluation["details"]:
-                                        with me.box(
-                                            style=me.Style(
-                                                display="flex",
-                                                flex_direction="row",
-                                                align_items="center",
-                                                gap=8,
-                                                margin=me.Margin(bottom=8),
-                                            )
-                                        ):
+                                        with me.box(style=_DETAIL_ROW_STYLE):
                                             if detail["answer"]:
                                                 me.icon(
                                                     "check_circle",
-                                                    style=me.Style(
-                                                        color=me.theme_var("success")
-                                                    ),
+                                                    style=_PASS_ICON_STYLE,
                                                 )
                                             else:
                                                 me.icon(
-                                                    "cancel",
-                                                    style=me.Style(
-                                                        color=me.theme_var("error")
-                                                    ),
+                                                    "cancel", style=_FAIL_ICON_STYLE
                                                 )
                                             me.text(detail["question"])
             else:
@@ -329,19 +579,29 @@ def on_upload(e: me.UploadEvent):
         file.mime_type,
         file.getvalue(),
     )
+    # Assign the document ID up front so the page can move on while the
+    # Firestore write happens in the background.
     new_item = MediaItem(
+        id=uuid.uuid4().hex,
         gcsuri=gcs_url,
         prompt="",
         mime_type=file.mime_type,
         user_email=app_state.user_email,
+        timestamp=datetime.datetime.now(datetime.UTC),
     )
-    add_media_item_to_firestore(new_item)
-    if new_item.id:
-        state.selected_media_item_id = new_item.id
-    else:
-        print("ERROR: Could not get ID for newly uploaded item.")
+    saved = _save_new_item_in_background(new_item)
+    state.selected_media_item_id = new_item.id
+    state.upload_error = None
     yield
 
+    # The page already shows the upload; confirm it reached the library.
+    try:
+        saved.result()
+    except Exception:
+        state.selected_media_item_id = None
+        state.upload_error = "The upload could not be saved. Please try again."
+        yield
+
 
 @me.component
 def _uploader_placeholder(on_library_select: Callable):
@@ -379,35 +639,206 @@ def _uploader_placeholder(on_library_select: Callable):
             me.icon("photo_library")
 
 
+def _chooser_item_from_dict(doc_id: str, data: dict) -> MediaItem:
+    """Builds a MediaItem from a CHOOSER_FIELDS projection.
+
+    The projection only carries tile fields, so this skips the full
+    conversion done by _create_media_item_from_dict.
+    """
+    gcsuri = data.get("gcsuri")
+    if isinstance(gcsuri, list):
+        gcsuri = gcsuri[0] if gcsuri else None
+    duration = data.get("duration")
+    return MediaItem(
+        id=doc_id,
+        gcsuri=gcsuri,
+        gcs_uris=data.get("gcs_uris") or [],
+        mime_type=data.get("mime_type"),
+        media_type=data.get("media_type"),
+        model=data.get("model"),
+        mode=data.get("mode"),
+        aspect=data.get("aspect"),
+        duration=duration if isinstance(duration, (int, float)) else None,
+        reference_image=data.get("reference_image"),
+        r2v_reference_images=data.get("r2v_reference_images") or [],
+        r2v_style_image=data.get("r2v_style_image"),
+    )
+
+
+@lru_cache(maxsize=2)
+def _chooser_base_query(full: bool) -> firestore.Query:
+    """Builds the ordered (and unless `full`, projected) chooser query once.
+
+    Firestore queries are immutable, so cursors and limits applied per call
+    return new queries and leave this one untouched.
+    """
+    query = db.collection(config.GENMEDIA_COLLECTION_NAME).order_by(
+        "timestamp", direction=firestore.Query.DESCENDING
+    )
+    return query if full else query.select(CHOOSER_FIELDS)
+
+
 def get_all_media_for_chooser(
-    page_size: int, start_after=None
+    page_size: int, start_after=None, full: bool = False
 ) -> tuple[list[MediaItem], firestore.DocumentSnapshot | None]:
+    """Fetches a page of media for the chooser, newest first.
+
+    Unless `full` is set, only CHOOSER_FIELDS are fetched; the selected item is
+    re-read in full by ID.
+    """
     if not db:
         return [], None
     try:
-        query = db.collection(config.GENMEDIA_COLLECTION_NAME).order_by(
-            "timestamp", direction=firestore.Query.DESCENDING
-        )
+        query = _chooser_base_query(full)
         if start_after:
             query = query.start_after(start_after)
         query = query.limit(page_size)
-        docs = list(query.stream())
 
-        media_items = [
-            _create_media_item_from_dict(doc.id, doc.to_dict())
-            for doc in docs
-            if doc.to_dict() is not None
-        ]
-        last_doc = docs[-1] if docs else None
+        # Decode documents as they arrive on the stream rather than after the
+        # whole page has been received.
+        to_item = _create_media_item_from_dict if full else _chooser_item_from_dict
+        media_items = []
+        last_doc = None
+        for doc in query.stream():
+            last_doc = doc
+            data = doc.to_dict()
+            if data is not None:
+                media_items.append(to_item(doc.id, data))
         return media_items, last_doc
     except Exception as e:
         print(f"Error fetching all media for chooser: {e}")
         return [], None
 
 
+def _tile_render_type(mime_type: str, https_url: str) -> str:
+    """Picks the media_tile type from the MIME type, else the URL extension."""
+    if mime_type:
+        if mime_type.startswith("video/"):
+            return "video"
+        if mime_type.startswith("audio/"):
+            return "audio"
+    elif https_url:
+        if ".mp4" in https_url or ".webm" in https_url:
+            return "video"
+        if ".wav" in https_url or ".mp3" in https_url:
+            return "audio"
+    return "image"
+
+
+def _to_chooser_tiles(items: list[MediaItem]) -> list[ChooserTile]:
+    """Resolves the display URL and pills once per fetched chooser item."""
+    tiles = []
+    for item in items:
+        gcs_uri = item.primary_uri
+        signed_url = create_display_url(gcs_uri) if gcs_uri else ""
+        mime_type = item.mime_type or ""
+        tiles.append(
+            ChooserTile(
+                id=item.id,
+                mime_type=mime_type,
+                signed_url=signed_url,
+                pills_json=get_pills_for_item(item, signed_url),
+                render_type=_tile_render_type(mime_type, signed_url),
+            )
+        )
+    return tiles
+
+
+def _prefetch_chooser_page(start_after: firestore.DocumentSnapshot | None) -> None:
+    """Fetches the chooser page after `start_after` on a background thread."""
+    if start_after is None:
+        return
+    with _chooser_prefetch_lock:
+        if (
+            start_after.id in _chooser_prefetch_in_flight
+            or start_after.id in _chooser_prefetched_pages
+        ):
+            return
+        done = threading.Event()
+        _chooser_prefetch_in_flight[start_after.id] = done
+
+    def _run():
+        try:
+            items, last_doc = get_all_media_for_chooser(
+                page_size=CHOOSER_PAGE_SIZE, start_after=start_after
+            )
+            tiles = _to_chooser_tiles(items)
+            with _chooser_prefetch_lock:
+                _chooser_prefetched_pages.pop(start_after.id, None)
+                _chooser_prefetched_pages[start_after.id] = (
+                    time.monotonic(),
+                    tiles,
+                    last_doc,
+                )
+                _expire_chooser_entries(_chooser_prefetched_pages)
+        finally:
+            with _chooser_prefetch_lock:
+                _chooser_prefetch_in_flight.pop(start_after.id, None)
+            done.set()
+
+    threading.Thread(target=_run, daemon=True).start()
+
+
+def _remember_chooser_cursor(last_doc: firestore.DocumentSnapshot | None) -> None:
+    if last_doc is None:
+        return
+    with _chooser_prefetch_lock:
+        _chooser_cursors.pop(last_doc.id, None)
+        _chooser_cursors[last_doc.id] = (time.monotonic(), last_doc)
+        _expire_chooser_entries(_chooser_cursors)
+
+
+def _expire_chooser_entries(entries: dict) -> None:
+    """Drops entries past their TTL and the oldest beyond the size cap.
+
+    Callers hold _chooser_prefetch_lock. Entries are re-inserted rather than
+    overwritten, so they stay in time order and expired ones are at the front.
+    """
+    now = time.monotonic()
+    while entries:
+        oldest = next(iter(entries))
+        if (
+            len(entries) <= MAX_PREFETCHED_CHOOSER_PAGES
+            and now - entries[oldest][0] < CHOOSER_PREFETCH_TTL_SECONDS
+        ):
+            break
+        del entries[oldest]
+
+
+def _take_chooser_cursor(doc_id: str) -> firestore.DocumentSnapshot | None:
+    with _chooser_prefetch_lock:
+        _expire_chooser_entries(_chooser_cursors)
+        entry = _chooser_cursors.pop(doc_id, None)
+    return entry[1] if entry else None
+
+
+def _take_prefetched_chooser_page(
+    start_after_id: str,
+) -> tuple[list[ChooserTile], firestore.DocumentSnapshot | None] | None:
+    with _chooser_prefetch_lock:
+        _expire_chooser_entries(_chooser_prefetched_pages)
+        entry = _chooser_prefetched_pages.pop(start_after_id, None)
+    return (entry[1], entry[2]) if entry else None
+
+
+def _wait_for_chooser_prefetch(start_after_id: str) -> None:
+    """Blocks until an in-flight prefetch of this page finishes, if any.
+
+    Scrolling faster than a page fetch would otherwise issue the same query a
+    second time from the handler.
+    """
+    with _chooser_prefetch_lock:
+        done = _chooser_prefetch_in_flight.get(start_after_id)
+    if done:
+        done.wait(timeout=CHOOSER_PREFETCH_WAIT_SECONDS)
+
+
 @me.component
 def render_chooser_dialog():
     state = me.state(PageState)
+    # Nothing to render while closed; skip building the dialog tree entirely.
+    if not state.show_chooser_dialog:
+        return
 
     def handle_item_selected(e: me.WebEvent):
         state = me.state(PageState)
@@ -415,107 +846,85 @@ def render_chooser_dialog():
         state.show_chooser_dialog = False
         state.chooser_media_items = []
         state.selected_media_item_id = media_item_id
+        state.upload_error = None
         yield
 
     def handle_load_more(e: me.WebEvent):
         if state.chooser_is_loading or state.chooser_all_items_loaded:
             return
 
-        state.chooser_is_loading = True
-        yield
-
-        last_doc_ref = (
-            db.collection(config.GENMEDIA_COLLECTION_NAME)
-            .document(state.chooser_last_doc_id)
-            .get()
-        )
-        new_items, last_doc = get_all_media_for_chooser(
-            page_size=20,
-            start_after=last_doc_ref,
-        )
+        prefetched = _take_prefetched_chooser_page(state.chooser_last_doc_id)
+        if not prefetched:
+            state.chooser_is_loading = True
+            yield
 
-        for item in new_items:
-            gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
-            item.signed_url = create_display_url(gcs_uri) if gcs_uri else ""
+            _wait_for_chooser_prefetch(state.chooser_last_doc_id)
+            prefetched = _take_prefetched_chooser_page(state.chooser_last_doc_id)
+        if prefetched:
+            new_items, last_doc = prefetched
+        else:
+            cursor = _take_chooser_cursor(state.chooser_last_doc_id)
+            if cursor is None:
+                cursor = (
+                    db.collection(config.GENMEDIA_COLLECTION_NAME)
+                    .document(state.chooser_last_doc_id)
+                    .get()
+                )
+            new_media, last_doc = get_all_media_for_chooser(
+                page_size=CHOOSER_PAGE_SIZE,
+                start_after=cursor,
+            )
+            new_items = _to_chooser_tiles(new_media)
 
         state.chooser_media_items.extend(new_items)
+        # Bound state size and render cost by unloading the tiles the user has
+        # already scrolled past; paging carries on to older media.
+        overflow = len(state.chooser_media_items) - CHOOSER_MAX_ITEMS
+        if overflow > 0:
+            del state.chooser_media_items[:overflow]
+            state.chooser_items_unloaded = True
+        _remember_chooser_cursor(last_doc)
+        _prefetch_chooser_page(last_doc)
         state.chooser_last_doc_id = last_doc.id if last_doc else ""
+        if not last_doc:
+            state.chooser_all_items_loaded = True
         state.chooser_is_loading = False
         yield
 
-    dialog_style = me.Style(
-        width="95vw", height="80vh", display="flex", flex_direction="column"
-    )
-
-    with dialog(is_open=state.show_chooser_dialog, dialog_style=dialog_style): # pylint: disable=E1129:not-context-manager
-        if state.show_chooser_dialog:
-            with me.box(
-                style=me.Style(
-                    display="flex", flex_direction="column", gap=16, flex_grow=1
-                )
-            ):
-                with me.box(
-                    style=me.Style(
-                        display="flex",
-                        flex_direction="row",
-                        justify_content="space-between",
-                        align_items="center",
-                        width="100%",
-                    )
+    with dialog(is_open=True, dialog_style=_CHOOSER_DIALOG_STYLE): # pylint: disable=E1129:not-context-manager
+        with me.box(style=_CHOOSER_BODY_STYLE):
+            with me.box(style=_CHOOSER_HEADER_STYLE):
+                me.text("Select a Media Asset from Library", type="headline-6")
+                with me.content_button(
+                    type="icon",
+                    on_click=lambda e: setattr(state, "show_chooser_dialog", False),
                 ):
-                    me.text("Select a Media Asset from Library", type="headline-6")
-                    with me.content_button(
-                        type="icon",
-                        on_click=lambda e: setattr(state, "show_chooser_dialog", False),
-                    ):
-                        me.icon("close")
-
-                with me.box(
-                    style=me.Style(
-                        flex_grow=1, overflow_y="auto", padding=me.Padding.all(10)
-                    )
-                ):
-                    if state.chooser_is_loading and not state.chooser_media_items:
-                        me.progress_spinner()
-                    else:
-                        with me.box(
-                            style=me.Style(
-                                display="grid",
-                                grid_template_columns="repeat(auto-fill, minmax(250px, 1fr))",
-                                gap="16px",
-                            )
-                        ):
-                            for item in state.chooser_media_items:
-                                https_url = (
-                                    item.signed_url
-                                    if hasattr(item, "signed_url")
-                                    else ""
-                                )
+                    me.icon("close")
 
-                                render_type = "image"
-                                if item.mime_type:
-                                    if item.mime_type.startswith("video/"):
-                                        render_type = "video"
-                                    elif item.mime_type.startswith("audio/"):
-                                        render_type = "audio"
-                                elif https_url:
-                                    if ".mp4" in https_url or ".webm" in https_url:
-                                        render_type = "video"
-                                    elif ".wav" in https_url or ".mp3" in https_url:
-                                        render_type = "audio"
-
-                                media_tile(
-                                    key=item.id,
-                                    on_click=handle_item_selected,
-                                    media_type=render_type,
-                                    https_url=https_url,
-                                    pills_json="[]",
-                                )
-                        scroll_sentinel(
-                            on_visible=handle_load_more,
-                            is_loading=state.chooser_is_loading,
-                            all_items_loaded=state.chooser_all_items_loaded,
+            with me.box(style=_CHOOSER_SCROLL_STYLE):
+                if state.chooser_is_loading and not state.chooser_media_items:
+                    me.progress_spinner()
+                else:
+                    if state.chooser_items_unloaded:
+                        me.text(
+                            "Newer items were unloaded as you scrolled. "
+                            "Reopen the chooser to see them again.",
+                            type="body-2",
                         )
+                    with me.box(style=_CHOOSER_GRID_STYLE):
+                        for item in state.chooser_media_items:
+                            media_tile(
+                                key=item.id,
+                                on_click=handle_item_selected,
+                                media_type=item.render_type,
+                                https_url=item.signed_url,
+                                pills_json=item.pills_json,
+                            )
+                    scroll_sentinel(
+                        on_visible=handle_load_more,
+                        is_loading=state.chooser_is_loading,
+                        all_items_loaded=state.chooser_all_items_loaded,
+                    )
 
 
 def open_chooser_dialog(e: me.ClickEvent):
@@ -524,16 +933,15 @@ def open_chooser_dialog(e: me.ClickEvent):
     state.chooser_is_loading = True
     state.chooser_media_items = []
     state.chooser_all_items_loaded = False
+    state.chooser_items_unloaded = False
     state.chooser_last_doc_id = ""
     yield
 
-    items, last_doc = get_all_media_for_chooser(page_size=20)
+    items, last_doc = get_all_media_for_chooser(page_size=CHOOSER_PAGE_SIZE)
+    _remember_chooser_cursor(last_doc)
+    _prefetch_chooser_page(last_doc)
 
-    for item in items:
-        gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
-        item.signed_url = create_display_url(gcs_uri) if gcs_uri else ""
-
-    state.chooser_media_items = items
+    state.chooser_media_items = _to_chooser_tiles(items)
     state.chooser_last_doc_id = last_doc.id if last_doc else ""
     if not last_doc:
         state.chooser_all_items_loaded = True
@@ -546,10 +954,19 @@ def on_generate_criteria_click(e: me.ClickEvent):
     if not state.selected_media_item_id:
         return
 
-    item = get_media_item_by_id(state.selected_media_item_id)
+    item = _get_item_cached(state.selected_media_item_id)
     if not item or not item.prompt:
         return
 
+    cache_key = (item.prompt, state.additional_guidance)
+    cached_criteria = _cache_get(_criteria_cache, cache_key)
+    if cached_criteria:
+        state.criteria = {k: list(v) for k, v in cached_criteria.items()}
+        state.evaluations = {}
+        state.criteria_error = None
+        yield
+        return
+
     state.is_generating_criteria = True
     state.criteria = {}
     state.evaluations = {}
@@ -557,13 +974,11 @@ def on_generate_criteria_click(e: me.ClickEvent):
     yield
 
     try:
-        criteria_result = generate_guideline_criteria(
-            item.prompt, state.additional_guidance
-        )
+        criteria_result = _criteria_future(*cache_key).result()
         if not any(criteria_result.values()):
             state.criteria_error = "Failed to generate any guideline criteria. The model may have returned an empty response."
         else:
-            state.criteria = criteria_result
+            state.criteria = {k: list(v) for k, v in criteria_result.items()}
     except Exception as ex:
         error_message = f"An error occurred while generating criteria: {ex}"
         print(f"Error generating criteria: {error_message}")
@@ -12,12 +12,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import re
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import mesop as me
 
 from common.analytics import track_click, track_model_call
-from common.metadata import MediaItem, add_media_item_to_firestore
+from config.default import Default as cfg
+from common.metadata import MediaItem, queue_media_item_write
 from common.storage import store_to_gcs
 from common.utils import create_display_url, https_url_to_gcs_uri
 from components.header import header
@@ -26,9 +30,58 @@ from components.library.library_chooser_button import library_chooser_button
 from components.page_scaffold import page_frame, page_scaffold
 from components.pill import pill
 from components.snackbar import snackbar
-from models.upscale import UPSCALE_MODEL, get_image_resolution, upscale_image
+from models.upscale import (
+    UPSCALE_MODEL,
+    get_image_resolution,
+    get_upload_resolution,
+    remember_image_resolution,
+    upscale_image,
+)
 from state.state import AppState
 
+# Shared pool for upload-side GCS I/O and resolution probes.
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Library resolutions in the WIDTHxHEIGHT form the probe returns; others
+# (e.g. "1080p") are re-probed.
+_PIXEL_RESOLUTION = re.compile(r"^\d+x\d+$")
+
+# Factor users usually try next after each upscale.
+_NEXT_UPSCALE_FACTOR = {"x2": "x3", "x3": "x4"}
+# Speculative upscales by (input GCS URI, factor), oldest first.
+MAX_SPECULATIVE_UPSCALES = 16
+_speculative_upscales: dict[tuple[str, str], Future] = {}
+_speculative_upscales_lock = threading.Lock()
+
+
+def _start_speculative_upscale(input_gcs: str, factor: str) -> None:
+    """Upscales `input_gcs` by the next factor up in the background."""
+    next_factor = _NEXT_UPSCALE_FACTOR.get(factor)
+    if not cfg.UPSCALE_SPECULATIVE_ENABLED or not next_factor:
+        return
+    key = (input_gcs, next_factor)
+    with _speculative_upscales_lock:
+        if key in _speculative_upscales:
+            return
+        _speculative_upscales[key] = _UPLOAD_POOL.submit(
+            upscale_image, input_gcs, next_factor
+        )
+        while len(_speculative_upscales) > MAX_SPECULATIVE_UPSCALES:
+            oldest = next(iter(_speculative_upscales))
+            _speculative_upscales.pop(oldest).cancel()
+
+
+def _upscale(input_gcs: str, factor: str) -> tuple[str, str, str]:
+    """Returns a finished speculative upscale if there is one, else upscales now."""
+    with _speculative_upscales_lock:
+        future = _speculative_upscales.pop((input_gcs, factor), None)
+    if future:
+        try:
+            return future.result()
+        except Exception as ex:
+            print(f"Speculative upscale failed, retrying: {ex}")
+    return upscale_image(input_gcs, factor)
+
 IMAGE_BOX_STYLE = me.Style(
     width=512,
     height=512,
@@ -44,6 +97,20 @@ IMAGE_BOX_STYLE = me.Style(
     margin=me.Margin(top=16),
     background=me.theme_var("surface-container-lowest"),
 )
+ROW_STYLE = me.Style(
+    display="flex",
+    flex_direction="row",
+    gap=24,
+    padding=me.Padding.all(24),
+)
+COLUMN_STYLE = me.Style(display="flex", flex_direction="column", gap=16, flex=1)
+IMAGE_STYLE = me.Style(max_width="100%", max_height="100%", object_fit="contain")
+PLACEHOLDER_ICON_STYLE = me.Style(font_size=48, color=me.theme_var("outline"))
+CONTROLS_ROW_STYLE = me.Style(display="flex", flex_direction="row", gap=8)
+FULL_WIDTH_STYLE = me.Style(width="100%")
+UPSCALE_FACTOR_OPTIONS = [
+    me.SelectOption(label=factor, value=factor) for factor in ("x2", "x3", "x4")
+]
 
 
 @me.stateclass
@@ -57,6 +124,7 @@ class PageState:
     output_resolution: str = ""
 
     upscale_factor: str = "x2"
+    is_uploading: bool = False
     is_loading: bool = False
 
     snackbar_message: str = ""
@@ -65,20 +133,38 @@ class PageState:
 
 def on_upload(e: me.UploadEvent):
     state = me.state(PageState)
-    gcs_uri = store_to_gcs(
-        "upscale_inputs", e.file.name, e.file.mime_type, e.file.getvalue()
+    # The GCS upload and the resolution probe are independent; run them side
+    # by side. The upload streams from the file; the probe reads only the header.
+    e.file.seek(0)
+    upload_future = _UPLOAD_POOL.submit(
+        store_to_gcs, "upscale_inputs", e.file.name, e.file.mime_type, e.file
     )
-    state.input_image_gcs = gcs_uri
-    state.input_image_url = create_display_url(gcs_uri)
-    state.input_resolution = get_image_resolution(e.file.getvalue())
+    resolution_future = _UPLOAD_POOL.submit(get_upload_resolution, e.file)
+    state.is_uploading = True
     yield
 
+    try:
+        gcs_uri = upload_future.result()
+        state.input_image_gcs = gcs_uri
+        state.input_image_url = create_display_url(gcs_uri)
+        state.input_resolution = resolution_future.result()
+        # upscale_image probes the input again by URI; let it reuse this result.
+        remember_image_resolution(gcs_uri, state.input_resolution)
+    except Exception as ex:
+        print(f"Upload error: {ex}")
+        show_snackbar(f"Upload failed: {ex}")
+    finally:
+        state.is_uploading = False
+        yield
+
 
 def on_library_select(e: LibrarySelectionChangeEvent):
     state = me.state(PageState)
     state.input_image_gcs = e.gcs_uri
     state.input_image_url = create_display_url(e.gcs_uri)
-    # We need to fetch resolution for library images too
+    # Reuse the resolution stored with the library item when there is one.
+    if e.resolution and _PIXEL_RESOLUTION.match(e.resolution):
+        remember_image_resolution(e.gcs_uri, e.resolution)
     state.input_resolution = get_image_resolution(e.gcs_uri)
     yield
 
@@ -86,7 +172,6 @@ def on_library_select(e: LibrarySelectionChangeEvent):
 def on_factor_change(e: me.SelectSelectionChangeEvent):
     state = me.state(PageState)
     state.upscale_factor = e.value
-    yield
 
 
 @track_click(element_id="upscale_button")
@@ -95,7 +180,8 @@ def on_upscale(e: me.ClickEvent):
     app_state = me.state(AppState)
 
     if not state.input_image_gcs:
-        yield from show_snackbar("Please select an input image first.")
+        show_snackbar("Please select an input image first.")
+        yield
         return
 
     state.is_loading = True
@@ -111,10 +197,11 @@ def on_upscale(e: me.ClickEvent):
             upscale_factor=state.upscale_factor,
             input_resolution=state.input_resolution,
         ):
-            output_gcs, original_res, upscaled_res = upscale_image(
+            output_gcs, original_res, upscaled_res = _upscale(
                 state.input_image_gcs, state.upscale_factor
             )
         generation_time = time.time() - start_time
+        _start_speculative_upscale(state.input_image_gcs, state.upscale_factor)
 
         state.output_image_gcs = output_gcs
         state.output_image_url = create_display_url(output_gcs)
@@ -137,12 +224,22 @@ def on_upscale(e: me.ClickEvent):
             media_type="image",
             comment="Upscaled image",
         )
-        add_media_item_to_firestore(item)
-        yield from show_snackbar("Image upscaled and saved to library.")
+        # Show the result while the library write is committed in the background.
+        saved = queue_media_item_write(item)
+        state.is_loading = False
+        show_snackbar("Image upscaled. Saving to library...")
+        yield
+
+        try:
+            saved.result()
+            show_snackbar("Image upscaled and saved to library.")
+        except Exception as save_ex:
+            print(f"Upscale library save error: {save_ex}")
+            show_snackbar("Image upscaled, but it could not be saved to the library.")
 
     except Exception as ex:
         print(f"Upscale error: {ex}")
-        yield from show_snackbar(f"Error: {ex}")
+        show_snackbar(f"Error: {ex}")
     finally:
         state.is_loading = False
         yield
@@ -160,15 +257,34 @@ def on_clear(e: me.ClickEvent):
 
 
 def show_snackbar(message: str):
+    """Shows a message; the caller's next yield renders it."""
     state = me.state(PageState)
     state.snackbar_message = message
     state.show_snackbar = True
-    yield
-    time.sleep(3)
+
+
+def on_snackbar_dismiss(e: me.WebEvent):
+    state = me.state(PageState)
     state.show_snackbar = False
     yield
 
 
+def _image_card(
+    url: str, *, placeholder: str, is_loading: bool, loading_label: str = ""
+):
+    """Renders an image box with a spinner while loading or a placeholder when empty."""
+    with me.box(style=IMAGE_BOX_STYLE):
+        if is_loading:
+            me.progress_spinner()
+            if loading_label:
+                me.text(loading_label)
+        elif url:
+            me.image(src=url, style=IMAGE_STYLE)
+        else:
+            me.icon("image", style=PLACEHOLDER_ICON_STYLE)
+            me.text(placeholder)
+
+
 @me.page(path="/imagen-upscale", title="Imagen 4 Upscale")
 def page():
     state = me.state(PageState)
@@ -177,41 +293,18 @@ def page():
         with page_frame():  # pylint: disable=not-context-manager
             header("Imagen 4 Upscale", "zoom_in", current_status="Preview")
 
-            with me.box(
-                style=me.Style(
-                    display="flex",
-                    flex_direction="row",
-                    gap=24,
-                    padding=me.Padding.all(24),
-                )
-            ):
+            with me.box(style=ROW_STYLE):
                 # Input Column
-                with me.box(
-                    style=me.Style(
-                        display="flex", flex_direction="column", gap=16, flex=1
-                    )
-                ):
+                with me.box(style=COLUMN_STYLE):
                     me.text("Input Image", type="headline-6")
                     
 
-                    with me.box(style=IMAGE_BOX_STYLE):
-                        if state.input_image_url:
-                            me.image(
-                                src=state.input_image_url,
-                                style=me.Style(
-                                    max_width="100%",
-                                    max_height="100%",
-                                    object_fit="contain",
-                                ),
-                            )
-                        else:
-                            me.icon(
-                                "image",
-                                style=me.Style(
-                                    font_size=48, color=me.theme_var("outline")
-                                ),
-                            )
-                            me.text("No image selected")
+                    _image_card(
+                        state.input_image_url,
+                        placeholder="No image selected",
+                        is_loading=state.is_uploading,
+                        loading_label="Uploading...",
+                    )
 
                     if state.input_resolution:
                         pill(
@@ -220,7 +313,7 @@ def page():
                         )
 
                     # controls at bottom of input image
-                    with me.box(style=me.Style(display="flex", gap=8)):
+                    with me.box(style=CONTROLS_ROW_STYLE):
                         me.uploader(
                             label="Upload Image",
                             on_upload=on_upload,
@@ -237,26 +330,20 @@ def page():
                         # Controls Row
                         me.select(
                             label="Upscale Factor",
-                            options=[
-                                me.SelectOption(label="x2", value="x2"),
-                                me.SelectOption(label="x3", value="x3"),
-                                me.SelectOption(label="x4", value="x4"),
-                            ],
+                            options=UPSCALE_FACTOR_OPTIONS,
                             value=state.upscale_factor,
                             on_selection_change=on_factor_change,
-                            style=me.Style(width="100%"),
+                            style=FULL_WIDTH_STYLE,
                             appearance="outline",
                         )
 
-                    with me.box(
-                        style=me.Style(flex_direction="row", display="flex", gap=8)
-                    ):
+                    with me.box(style=CONTROLS_ROW_STYLE):
                         me.button(
                             "Upscale",
                             on_click=on_upscale,
                             type="raised",
                             disabled=state.is_loading or not state.input_image_gcs,
-                            style=me.Style(width="100%"),
+                            style=FULL_WIDTH_STYLE,
                         )
 
                         if state.is_loading:
@@ -266,38 +353,19 @@ def page():
                             "Clear",
                             on_click=on_clear,
                             type="stroked",
-                            style=me.Style(width="100%"),
+                            style=FULL_WIDTH_STYLE,
                         )
 
                 
 
                 # Output Column
-                with me.box(
-                    style=me.Style(
-                        display="flex", flex_direction="column", gap=16, flex=1
-                    )
-                ):
+                with me.box(style=COLUMN_STYLE):
                     me.text("Upscaled Image", type="headline-6")
-                    with me.box(style=IMAGE_BOX_STYLE):
-                        if state.output_image_url:
-                            me.image(
-                                src=state.output_image_url,
-                                style=me.Style(
-                                    max_width="100%",
-                                    max_height="100%",
-                                    object_fit="contain",
-                                ),
-                            )
-                        elif state.is_loading:
-                            me.progress_spinner()
-                        else:
-                            me.icon(
-                                "image",
-                                style=me.Style(
-                                    font_size=48, color=me.theme_var("outline")
-                                ),
-                            )
-                            me.text("Output will appear here")
+                    _image_card(
+                        state.output_image_url,
+                        placeholder="Output will appear here",
+                        is_loading=state.is_loading,
+                    )
 
                     if state.output_resolution:
                         pill(
@@ -305,4 +373,8 @@ def page():
                             pill_type="resolution",
                         )
 
-            snackbar(is_visible=state.show_snackbar, label=state.snackbar_message)
+            snackbar(
+                is_visible=state.show_snackbar,
+                label=state.snackbar_message,
+                on_dismiss=on_snackbar_dismiss,
+            )
@@ -14,10 +14,13 @@
 
 """Interior Design page."""
 
-import copy
 import datetime
 import json
+import os
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache, wraps
+import threading
 import time
 import uuid
 
@@ -52,14 +55,263 @@ from models.video_processing import process_videos
 from state.interior_design_v2_state import PageState
 from state.state import AppState
 
-with open("config/about_content.json", "r") as f:
-    about_content = json.load(f)
-    INTERIOR_DESIGN_INFO = next(
-        (s for s in about_content["sections"] if s.get("id") == "interior_design"),
-        None,
+FLOOR_PLAN_3D_PROMPT = "create a 3D version for the floor plan. make it realistic. keep the furnitures as per the floor plan and follow the measurement. retain the names of rooms in the appropriate location"
+ZOOMED_VIEW_PROMPT_TEMPLATE = "Using the provided 3D rendering as a layout guide, create a photorealistic interior photograph. The photo should be from a first-person perspective, as if a person is standing in the hallway or adjacent room and looking through the doorway into the {room_name}. Capture the sense of entering the room for the first time on a house tour. Ensure the lighting and furniture placement are consistent with the 3D model."
+
+# Styled images kept per room. The history is saved with the storyboard on
+# every change, so an unbounded list would grow each write.
+MAX_STYLE_HISTORY = 20
+
+# Uploads stream to GCS here so the handler can render a spinner first.
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=4)
+# Shared pool for model calls that run alongside the one a handler waits on.
+_GENERATION_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Zoomed room views started as soon as the rooms are known, keyed by
+# (3D view GCS URI, room name), oldest first.
+MAX_PREFETCHED_ZOOMS = 64
+_prefetched_zooms: dict[tuple[str, str], Future] = {}
+_prefetched_zooms_lock = threading.Lock()
+
+
+def _generate_zoomed_view(view_uri: str, room_name: str) -> list[str]:
+    """Renders a first-person photo of one room from the 3D view."""
+    gcs_uris, _, _, _, _ = generate_image_from_prompt_and_images(
+        prompt=ZOOMED_VIEW_PROMPT_TEMPLATE.format(room_name=room_name),
+        images=[view_uri],
+        aspect_ratio="16:9",
+        gcs_folder="interior_design_zoomed_views",
+        model_name=cfg.INTERIOR_DESIGN_IMAGE_MODEL,
+    )
+    return gcs_uris
+
+
+def _log_prefetch_failure(room_name: str, future: Future) -> None:
+    if future.cancelled():
+        return
+    if future.exception():
+        print(f"Prefetched zoomed view for {room_name} failed: {future.exception()}")
+    elif not future.result():
+        print(f"Prefetched zoomed view for {room_name} returned no image.")
+
+
+def _prefetch_zoomed_views(view_uri: str, room_names: list[str]) -> None:
+    """Starts zoomed views for every room in the background."""
+    if not cfg.INTERIOR_DESIGN_PREFETCH_ROOMS:
+        return
+    with _prefetched_zooms_lock:
+        for room_name in room_names:
+            key = (view_uri, room_name)
+            if key not in _prefetched_zooms:
+                future = _GENERATION_POOL.submit(
+                    _generate_zoomed_view, view_uri, room_name
+                )
+                future.add_done_callback(
+                    lambda f, room_name=room_name: _log_prefetch_failure(room_name, f)
+                )
+                _prefetched_zooms[key] = future
+        while len(_prefetched_zooms) > MAX_PREFETCHED_ZOOMS:
+            oldest = next(iter(_prefetched_zooms))
+            _prefetched_zooms.pop(oldest).cancel()
+
+
+def _zoomed_view(
+    view_uri: str, room_name: str, prefetched: Future | None = None
+) -> list[str]:
+    """Returns the prefetched zoomed view if it produced an image, else renders it.
+
+    A prefetch that failed or came back empty is regenerated once; a direct
+    render is not retried.
+    """
+    if prefetched is None:
+        with _prefetched_zooms_lock:
+            prefetched = _prefetched_zooms.pop((view_uri, room_name), None)
+    if prefetched:
+        try:
+            gcs_uris = prefetched.result()
+            if gcs_uris:
+                return gcs_uris
+        except Exception:
+            pass  # Logged when the prefetch finished.
+        print(f"Regenerating zoomed view for {room_name} after a failed prefetch.")
+    return _generate_zoomed_view(view_uri, room_name)
+
+
+def _zoomed_view_future(view_uri: str, room_name: str) -> Future:
+    """Runs _zoomed_view for a room on the generation pool."""
+    # Claim the prefetch here rather than on the pool: it was submitted first,
+    # so a worker has picked it up before this task starts waiting on it.
+    with _prefetched_zooms_lock:
+        prefetched = _prefetched_zooms.pop((view_uri, room_name), None)
+    return _GENERATION_POOL.submit(_zoomed_view, view_uri, room_name, prefetched)
+
+
+# (session ID, handler) pairs with a generation running. The disabled
+# buttons only take effect once a render reaches the browser, so a quick
+# second click can still start the same generation twice.
+_handlers_in_flight: set[tuple[str, str]] = set()
+_handlers_in_flight_lock = threading.Lock()
+
+
+def _single_flight(handler_name: str):
+    """Decorator that drops a handler call while the same session's last one runs."""
+
+    def decorator(handler_function):
+        @wraps(handler_function)
+        def wrapper(e: me.ClickEvent):
+            key = (me.state(AppState).session_id, handler_name)
+            with _handlers_in_flight_lock:
+                if key in _handlers_in_flight:
+                    return
+                _handlers_in_flight.add(key)
+            try:
+                yield from handler_function(e)
+            finally:
+                with _handlers_in_flight_lock:
+                    _handlers_in_flight.discard(key)
+
+        return wrapper
+
+    return decorator
+
+
+ABOUT_CONTENT_PATH = "config/about_content.json"
+
+
+@lru_cache(maxsize=1)
+def _about_section(section_id: str, mtime_ns: int) -> dict | None:
+    """Parses the about content and keeps only the requested section.
+
+    `mtime_ns` is only part of the cache key, so an edited file is re-read.
+    """
+    with open(ABOUT_CONTENT_PATH, "r") as f:
+        about_content = json.load(f)
+    return next(
+        (s for s in about_content["sections"] if s.get("id") == section_id), None
     )
 
 
+def _load_about_section(section_id: str) -> dict | None:
+    """Returns one about-page section, parsing the file only when it changes."""
+    try:
+        mtime_ns = os.stat(ABOUT_CONTENT_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _about_section(section_id, mtime_ns)
+
+
+TOP_MARGIN_STYLE = me.Style(margin=me.Margin(top=16))
+PAGE_COLUMN_STYLE = me.Style(
+    display="flex", flex_direction="column", gap=24, align_items="center"
+)
+INPUT_OUTPUT_ROW_STYLE = me.Style(
+    display="flex", flex_direction="row", gap=32, justify_content="center"
+)
+DESIGN_ROW_STYLE = me.Style(
+    display="flex",
+    flex_direction="row",
+    gap=24,
+    margin=me.Margin(top=24),
+    width="100%",
+    justify_content="center",
+)
+STORYBOARD_SECTION_STYLE = me.Style(width="100%", margin=me.Margin(top=32))
+STORYBOARD_TITLE_STYLE = me.Style(margin=me.Margin(bottom=16), text_align="center")
+STORYBOARD_CAROUSEL_STYLE = me.Style(
+    display="flex",
+    flex_direction="row",
+    gap=16,
+    overflow_x="auto",
+    padding=me.Padding(bottom=16),  # for scrollbar
+)
+VIDEO_BUTTON_ROW_STYLE = me.Style(
+    width="100%", text_align="center", margin=me.Margin(top=24)
+)
+SPINNER_ROW_STYLE = me.Style(display="flex", align_items="center", gap=8)
+FINAL_VIDEO_ROW_STYLE = me.Style(
+    margin=me.Margin(top=24), display="flex", justify_content="center"
+)
+FINAL_VIDEO_STYLE = me.Style(width="100%", max_width="720px", border_radius=8)
+
+
+# (GCS URI key, display URL key) pairs stored on a storyboard and its items.
+_STORYBOARD_URL_KEYS = (
+    ("original_floor_plan_uri", "original_floor_plan_display_url"),
+    ("generated_3d_view_uri", "generated_3d_view_display_url"),
+    ("final_video_uri", "final_video_display_url"),
+)
+_STORYBOARD_ITEM_URL_KEYS = (
+    ("styled_image_uri", "styled_image_display_url"),
+    ("generated_video_uri", "generated_video_display_url"),
+)
+
+
+def _hydrate_display_urls(storyboard: dict) -> None:
+    """Fills in display URLs missing from storyboards saved before they were stored."""
+    targets = [(storyboard, _STORYBOARD_URL_KEYS)] + [
+        (item, _STORYBOARD_ITEM_URL_KEYS)
+        for item in storyboard.get("storyboard_items", [])
+    ]
+    for target, url_keys in targets:
+        for uri_key, display_key in url_keys:
+            if target.get(uri_key) and not target.get(display_key):
+                target[display_key] = create_display_url(target[uri_key])
+
+
+def _drop_empty_storyboard_items(storyboard: dict) -> None:
+    """Removes items for rooms whose zoomed view was never generated."""
+    storyboard["storyboard_items"] = [
+        item
+        for item in storyboard.get("storyboard_items", [])
+        if item.get("styled_image_uri")
+    ]
+
+
+def _get_or_add_storyboard_item(storyboard: dict, room_name: str) -> dict:
+    """Returns the storyboard item for a room, adding an empty one if needed."""
+    storyboard_item = _find_storyboard_item(storyboard, room_name)
+    if not storyboard_item:
+        storyboard_item = {
+            "room_name": room_name,
+            "styled_image_uri": "",
+            "style_history": [],
+        }
+        storyboard["storyboard_items"].append(storyboard_item)
+    return storyboard_item
+
+
+def _now_iso() -> str:
+    """Returns the current UTC time as an ISO 8601 string."""
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _new_storyboard(user_email: str, floor_plan_uri: str) -> dict:
+    """Returns an unsaved storyboard for a newly chosen floor plan."""
+    return {
+        "user_email": user_email,
+        "timestamp": _now_iso(),
+        "original_floor_plan_uri": floor_plan_uri,
+        "original_floor_plan_display_url": create_display_url(floor_plan_uri),
+        "room_names": [],
+        "storyboard_items": [],
+    }
+
+
+def _record_style(storyboard_item: dict, gcs_uri: str) -> None:
+    """Appends to a room's style history, keeping only the newest entries."""
+    history = storyboard_item.setdefault("style_history", [])
+    history.append(gcs_uri)
+    del history[:-MAX_STYLE_HISTORY]
+
+
+def _find_storyboard_item(storyboard: dict, room_name: str | None) -> dict | None:
+    """Returns the storyboard item for a room, or None if it has none yet."""
+    for item in storyboard.get("storyboard_items", []):
+        if item["room_name"] == room_name:
+            return item
+    return None
+
+
 def on_load(e: me.LoadEvent):
     """Loads a storyboard from Firestore if an ID is provided in the URL."""
     state = me.state(PageState)
@@ -68,53 +320,30 @@ def on_load(e: me.LoadEvent):
         if storyboard_id:
             from config.firebase_config import FirebaseClient
 
-            db = FirebaseClient().get_client()
-            doc_ref = db.collection("interior_design_storyboards").document(
-                storyboard_id
-            )
-            doc = doc_ref.get()
-            if doc.exists:
-                storyboard = doc.to_dict()
-                # Hydrate old data: generate display URLs if they don't exist.
-                if storyboard.get("original_floor_plan_uri") and not storyboard.get(
-                    "original_floor_plan_display_url"
-                ):
-                    storyboard["original_floor_plan_display_url"] = create_display_url(
-                        storyboard["original_floor_plan_uri"]
-                    )
-                if storyboard.get("generated_3d_view_uri") and not storyboard.get(
-                    "generated_3d_view_display_url"
-                ):
-                    storyboard["generated_3d_view_display_url"] = create_display_url(
-                        storyboard["generated_3d_view_uri"]
-                    )
-                if storyboard.get("final_video_uri") and not storyboard.get(
-                    "final_video_display_url"
-                ):
-                    storyboard["final_video_display_url"] = create_display_url(
-                        storyboard["final_video_uri"]
-                    )
-
-                for item in storyboard.get("storyboard_items", []):
-                    if item.get("styled_image_uri") and not item.get(
-                        "styled_image_display_url"
-                    ):
-                        item["styled_image_display_url"] = create_display_url(
-                            item["styled_image_uri"]
-                        )
-                    if item.get("generated_video_uri") and not item.get(
-                        "generated_video_display_url"
-                    ):
-                        item["generated_video_display_url"] = create_display_url(
-                            item["generated_video_uri"]
-                        )
+            # Paint the page with a spinner first; the read comes after.
+            state.is_loading_storyboard = True
+            yield
 
-                state.storyboard = storyboard
-                print(f"Loaded storyboard {storyboard_id} from Firestore.")
-            else:
-                yield from show_snackbar(
-                    state, f"Could not find storyboard with ID: {storyboard_id}"
+            try:
+                db = FirebaseClient().get_client()
+                doc_ref = db.collection("interior_design_storyboards").document(
+                    storyboard_id
                 )
+                doc = doc_ref.get()
+                if doc.exists:
+                    storyboard = doc.to_dict()
+                    _hydrate_display_urls(storyboard)
+                    # Older storyboards stored the selected room; it is
+                    # page state now and is not written back.
+                    state.selected_room = storyboard.pop("selected_room", "")
+                    state.storyboard = storyboard
+                    print(f"Loaded storyboard {storyboard_id} from Firestore.")
+                else:
+                    show_snackbar(
+                        state, f"Could not find storyboard with ID: {storyboard_id}"
+                    )
+            finally:
+                state.is_loading_storyboard = False
         state.initial_load_complete = True
     yield
 
@@ -142,13 +371,18 @@ def page_content():
     if state.is_detail_dialog_open:
         item_detail_dialog(on_close=on_close_detail_dialog)
 
-    snackbar(is_visible=state.show_snackbar, label=state.snackbar_message)
+    snackbar(
+        is_visible=state.show_snackbar,
+        label=state.snackbar_message,
+        on_dismiss=on_snackbar_dismiss,
+    )
 
     if state.info_dialog_open:
         with dialog(is_open=state.info_dialog_open):  # pylint: disable=not-context-manager
-            if INTERIOR_DESIGN_INFO:
-                me.text(f"About {INTERIOR_DESIGN_INFO[title]}", type="headline-6")
-                me.markdown(INTERIOR_DESIGN_INFO["description"])
+            info = _load_about_section("interior_design")
+            if info:
+                me.text(f"About {info['title']}", type="headline-6")
+                me.markdown(info["description"])
             else:
                 me.text("About Interior Design", type="headline-6")
                 me.markdown("Information for this page has not been configured yet.")
@@ -159,22 +393,16 @@ def page_content():
             me.text(f"Video Model: {cfg.INTERIOR_DESIGN_VIDEO_MODEL}")
             me.text(f"Video Duration: {cfg.INTERIOR_DESIGN_VIDEO_DURATION} seconds")
             
-            with me.box(style=me.Style(margin=me.Margin(top=16))):
+            with me.box(style=TOP_MARGIN_STYLE):
                 me.button("Close", on_click=close_info_dialog, type="flat")
 
-    with me.box(
-        style=me.Style(
-            display="flex", flex_direction="column", gap=24, align_items="center"
-        )
-    ):
+    with me.box(style=PAGE_COLUMN_STYLE):
         # Input and Output Area
-        with me.box(
-            style=me.Style(
-                display="flex", flex_direction="row", gap=32, justify_content="center"
-            )
-        ):
+        with me.box(style=INPUT_OUTPUT_ROW_STYLE):
             floor_plan_uploader(
                 storyboard=state.storyboard,
+                is_uploading=state.is_uploading_floor_plan
+                or state.is_loading_storyboard,
                 on_upload=on_upload_floor_plan,
                 on_library_select=on_select_floor_plan,
             )
@@ -185,92 +413,46 @@ def page_content():
             )
 
         if state.storyboard and state.storyboard.get("room_names"):
-            with me.box(
-                style=me.Style(
-                    display="flex",
-                    flex_direction="column",
-                    align_items="center",
-                    gap=10,
-                )
-            ):
-                me.text("Identified Rooms", type="headline-6")
-                with me.box(
-                    style=me.Style(
-                        display="flex",
-                        flex_direction="row",
-                        gap=10,
-                        flex_wrap="wrap",
-                        justify_content="center",
-                    )
-                ):
-                    for room in state.storyboard["room_names"]:
-                        with me.content_button(
-                            key=room, on_click=on_room_button_click, type="stroked"
-                        ):
-                            if (
-                                state.is_generating_zoom
-                                and state.storyboard.get("selected_room") == room
-                            ):
-                                me.progress_spinner(diameter=18)
-                            else:
-                                me.text(room)
+            generating_rooms = list(state.rooms_generating)
+            if state.is_generating_zoom and state.selected_room not in generating_rooms:
+                generating_rooms.append(state.selected_room)
+            room_selector(
+                room_names=state.storyboard["room_names"],
+                generating_rooms=generating_rooms,
+                on_room_select=on_room_button_click,
+                on_generate_all=on_generate_all_rooms_click,
+            )
 
         # Display the zoomed-in room view and design controls
         if state.storyboard and state.storyboard.get("storyboard_items"):
-            with me.box(
-                style=me.Style(
-                    display="flex",
-                    flex_direction="row",
-                    gap=24,
-                    margin=me.Margin(top=24),
-                    width="100%",
-                    justify_content="center",
-                )
-            ):
+            selected_item = _find_storyboard_item(state.storyboard, state.selected_room)
+            with me.box(style=DESIGN_ROW_STYLE):
                 room_view(
-                    storyboard=state.storyboard,
+                    storyboard_item=selected_item,
                     is_generating_zoom=state.is_generating_zoom,
                 )
                 design_studio(
-                    storyboard_item=next(
-                        (
-                            item
-                            for item in state.storyboard["storyboard_items"]
-                            if item["room_name"] == state.storyboard["selected_room"]
-                        ),
-                        None,
-                    ),
+                    storyboard_item=selected_item,
                     design_image_display_url=state.design_image_display_url,
+                    is_uploading_design_image=state.is_uploading_design_image,
                     is_designing=state.is_designing,
                     on_upload_design_image=on_upload_design_image,
                     on_select_design_image=on_select_design_image,
-                    on_design_prompt_input=on_design_prompt_input,
+                    design_prompt=state.design_prompt,
+                    on_design_prompt_blur=on_design_prompt_blur,
                     on_clear_design=on_clear_design,
                     on_design_click=on_design_click,
                 )
 
         # Storyboard Carousel
         if state.storyboard and state.storyboard.get("storyboard_items"):
-            with me.box(
-                style=me.Style(
-                    width="100%",
-                    margin=me.Margin(top=32),
-                )
-            ):
+            with me.box(style=STORYBOARD_SECTION_STYLE):
                 me.text(
                     "Storyboard",
                     type="headline-6",
-                    style=me.Style(margin=me.Margin(bottom=16), text_align="center"),
+                    style=STORYBOARD_TITLE_STYLE,
                 )
-                with me.box(
-                    style=me.Style(
-                        display="flex",
-                        flex_direction="row",
-                        gap=16,
-                        overflow_x="auto",
-                        padding=me.Padding(bottom=16),  # for scrollbar
-                    )
-                ):
+                with me.box(style=STORYBOARD_CAROUSEL_STYLE):
                     for item in state.storyboard["storyboard_items"]:
                         if item.get("generated_video_uri"):
                             storyboard_video_tile(
@@ -286,11 +468,7 @@ def page_content():
                                 room_name=item["room_name"],
                                 on_click=on_storyboard_item_click,
                             )
-                with me.box(
-                    style=me.Style(
-                        width="100%", text_align="center", margin=me.Margin(top=24)
-                    )
-                ):
+                with me.box(style=VIDEO_BUTTON_ROW_STYLE):
                     with me.content_button(
                         on_click=on_generate_video_click,
                         type="raised",
@@ -298,11 +476,7 @@ def page_content():
                         or not state.storyboard.get("storyboard_items"),
                     ):
                         if state.is_generating_video:
-                            with me.box(
-                                style=me.Style(
-                                    display="flex", align_items="center", gap=8
-                                )
-                            ):
+                            with me.box(style=SPINNER_ROW_STYLE):
                                 me.progress_spinner(diameter=18)
                                 me.text(state.video_generation_status)
                         else:
@@ -310,25 +484,22 @@ def page_content():
 
                 final_video_uri = state.storyboard.get("final_video_uri")
                 if final_video_uri:
-                    with me.box(
-                        style=me.Style(
-                            margin=me.Margin(top=24),
-                            display="flex",
-                            justify_content="center",
-                        )
-                    ):
+                    with me.box(style=FINAL_VIDEO_ROW_STYLE):
                         me.video(
                             src=state.storyboard.get("final_video_display_url", ""),
-                            style=me.Style(
-                                width="100%", max_width="720px", border_radius=8
-                            ),
+                            style=FINAL_VIDEO_STYLE,
                         )
 
 
 def show_snackbar(state: PageState, message: str):
-    """Displays a snackbar message at the bottom of the page."""
+    """Shows a message; the caller's next yield renders it."""
     state.snackbar_message = message
     state.show_snackbar = True
+
+
+def on_snackbar_dismiss(e: me.WebEvent):
+    state = me.state(PageState)
+    state.show_snackbar = False
     yield
 
 
@@ -340,42 +511,42 @@ def on_upload_floor_plan(e: me.UploadEvent):
     state = me.state(PageState)
     app_state = me.state(AppState)
     file = e.files[0]
-    gcs_url = store_to_gcs(
-        "interior_design_uploads", file.name, file.mime_type, file.getvalue()
+    # Stream the upload from a worker so the spinner renders while it runs.
+    file.seek(0)
+    upload_future = _UPLOAD_POOL.submit(
+        store_to_gcs, "interior_design_uploads", file.name, file.mime_type, file
     )
-    state.storyboard = {
-        "user_email": app_state.user_email,
-        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "original_floor_plan_uri": gcs_url,
-        "original_floor_plan_display_url": create_display_url(gcs_url),
-        "room_names": [],
-        "storyboard_items": [],
-        "selected_room": "",
-    }
-    state.storyboard = save_storyboard(state.storyboard)
-    print(f"storyboard created: {state.storyboard}")
+    state.is_uploading_floor_plan = True
     yield
 
+    try:
+        gcs_url = upload_future.result()
+        state.storyboard = save_storyboard(
+            _new_storyboard(app_state.user_email, gcs_url)
+        )
+        state.selected_room = ""
+        print(f"storyboard created: {state.storyboard}")
+    except Exception as ex:
+        show_snackbar(state, f"Upload failed: {ex}")
+    finally:
+        state.is_uploading_floor_plan = False
+        yield
+
 
 def on_select_floor_plan(e: LibrarySelectionChangeEvent):
     """Floor plan selection from library handler."""
     state = me.state(PageState)
     app_state = me.state(AppState)
-    state.storyboard = {
-        "user_email": app_state.user_email,
-        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        "original_floor_plan_uri": e.gcs_uri,
-        "original_floor_plan_display_url": create_display_url(e.gcs_uri),
-        "room_names": [],
-        "storyboard_items": [],
-        "selected_room": "",
-    }
-    state.storyboard = save_storyboard(state.storyboard)
+    state.storyboard = save_storyboard(
+        _new_storyboard(app_state.user_email, e.gcs_uri)
+    )
+    state.selected_room = ""
     print(f"storyboard created: {state.storyboard}")
     yield
 
 
 @track_click(element_id="interior_design_generate_3d_view_button")
+@_single_flight("generate_3d_view")
 def on_generate_3d_view_click(e: me.ClickEvent):
     """Handles the 3D view generation."""
     state = me.state(PageState)
@@ -385,12 +556,18 @@ def on_generate_3d_view_click(e: me.ClickEvent):
     state.error_message = ""
     yield
 
+    changed = False
     try:
-        prompt = "create a 3D version for the floor plan. make it realistic. keep the furnitures as per the floor plan and follow the measurement. retain the names of rooms in the appropriate location"
+        floor_plan_uri = state.storyboard["original_floor_plan_uri"]
 
+        # Room names are read from the floor plan, not the 3D view, so both
+        # model calls can run at once.
+        room_names_future = _GENERATION_POOL.submit(
+            extract_room_names_from_image, floor_plan_uri
+        )
         gcs_uris, _, _, _, _ = generate_image_from_prompt_and_images(
-            prompt=prompt,
-            images=[state.storyboard["original_floor_plan_uri"]],
+            prompt=FLOOR_PLAN_3D_PROMPT,
+            images=[floor_plan_uri],
             aspect_ratio="16:9",
             gcs_folder="interior_design_generations",
         model_name=cfg.INTERIOR_DESIGN_IMAGE_MODEL,
@@ -401,97 +578,147 @@ def on_generate_3d_view_click(e: me.ClickEvent):
             state.storyboard["generated_3d_view_display_url"] = create_display_url(
                 gcs_uris[0]
             )
+            changed = True
 
             try:
-                room_names = extract_room_names_from_image(
-                    state.storyboard["original_floor_plan_uri"]
-                )
+                room_names = room_names_future.result()
                 if not room_names:
-                    yield from show_snackbar(
-                        state, "No rooms were identified in the floor plan."
-                    )
+                    show_snackbar(state, "No rooms were identified in the floor plan.")
                 state.storyboard["room_names"] = room_names
+                _prefetch_zoomed_views(gcs_uris[0], room_names)
             except Exception as room_ex:
                 print(f"Could not extract room names: {room_ex}")
-                yield from show_snackbar(
+                show_snackbar(
                     state,
                     "An error occurred while extracting room names from the floor plan.",
                 )
 
         else:
-            yield from show_snackbar(
-                state, "Image generation failed to return a result."
-            )
+            show_snackbar(state, "Image generation failed to return a result.")
 
     except Exception as ex:
-        yield from show_snackbar(state, f"An error occurred during generation: {ex}")
+        show_snackbar(state, f"An error occurred during generation: {ex}")
     finally:
         state.is_generating = False
-        state.storyboard = save_storyboard(state.storyboard)
+        if changed:
+            state.storyboard = save_storyboard(
+                state.storyboard,
+                fields=[
+                    "generated_3d_view_uri",
+                    "generated_3d_view_display_url",
+                    "room_names",
+                ],
+            )
         yield
 
 
 @track_click(element_id="interior_design_room_button")
+@_single_flight("room_zoom")
 def on_room_button_click(e: me.ClickEvent):
     """Handles the generation of a zoomed-in view for a specific room."""
     state = me.state(PageState)
     state.design_prompt = ""
     room_name = e.key
 
-    storyboard_item = next(
-        (
-            item
-            for item in state.storyboard["storyboard_items"]
-            if item["room_name"] == room_name
-        ),
-        None,
-    )
-    if not storyboard_item:
-        storyboard_item = {
-            "room_name": room_name,
-            "styled_image_uri": "",
-            "style_history": [],
-        }
-        state.storyboard["storyboard_items"].append(storyboard_item)
-
+    storyboard_item = _get_or_add_storyboard_item(state.storyboard, room_name)
+    previous_uri = storyboard_item["styled_image_uri"]
     state.is_generating_zoom = True
-    state.storyboard["selected_room"] = room_name
+    state.selected_room = room_name
     storyboard_item["styled_image_uri"] = ""
     yield
 
+    changed = False
     try:
-        prompt = f"Using the provided 3D rendering as a layout guide, create a photorealistic interior photograph. The photo should be from a first-person perspective, as if a person is standing in the hallway or adjacent room and looking through the doorway into the {room_name}. Capture the sense of entering the room for the first time on a house tour. Ensure the lighting and furniture placement are consistent with the 3D model."
-
-        gcs_uris, _, _, _, _ = generate_image_from_prompt_and_images(
-            prompt=prompt,
-            images=[state.storyboard["generated_3d_view_uri"]],
-            aspect_ratio="16:9",
-            gcs_folder="interior_design_zoomed_views",
-        model_name=cfg.INTERIOR_DESIGN_IMAGE_MODEL,
-        )
+        gcs_uris = _zoomed_view(state.storyboard["generated_3d_view_uri"], room_name)
 
         if gcs_uris:
             storyboard_item["styled_image_uri"] = gcs_uris[0]
             storyboard_item["styled_image_display_url"] = create_display_url(
                 gcs_uris[0]
             )
-            storyboard_item["style_history"].append(gcs_uris[0])
+            _record_style(storyboard_item, gcs_uris[0])
+            changed = True
         else:
-            yield from show_snackbar(
-                state, "Zoomed view generation failed to return a result."
-            )
+            show_snackbar(state, "Zoomed view generation failed to return a result.")
 
     except Exception as ex:
-        yield from show_snackbar(
-            state, f"An error occurred during zoom generation: {ex}"
-        )
+        show_snackbar(state, f"An error occurred during zoom generation: {ex}")
     finally:
         state.is_generating_zoom = False
-        state.storyboard = save_storyboard(state.storyboard)
+        if not changed:
+            # Keep the room's earlier view, or drop the item if it never had one.
+            storyboard_item["styled_image_uri"] = previous_uri
+            _drop_empty_storyboard_items(state.storyboard)
+        if changed:
+            state.storyboard = save_storyboard(
+                state.storyboard, fields=["storyboard_items"]
+            )
         yield
 
 
-def on_design_prompt_input(e: me.InputEvent):
+@track_click(element_id="interior_design_generate_all_rooms_button")
+@_single_flight("room_zoom")
+def on_generate_all_rooms_click(e: me.ClickEvent):
+    """Generates zoomed views for every room that doesn't have one yet."""
+    state = me.state(PageState)
+    view_uri = state.storyboard["generated_3d_view_uri"]
+    pending = [
+        item
+        for item in (
+            _get_or_add_storyboard_item(state.storyboard, room_name)
+            for room_name in state.storyboard["room_names"]
+        )
+        if not item.get("styled_image_uri")
+    ]
+    if not pending:
+        show_snackbar(state, "Every room already has a view.")
+        yield
+        return
+
+    futures = {
+        _zoomed_view_future(view_uri, item["room_name"]): item for item in pending
+    }
+    state.rooms_generating = [item["room_name"] for item in pending]
+    yield
+
+    changed = False
+    failed_rooms = []
+    try:
+        for future in as_completed(futures):
+            storyboard_item = futures[future]
+            try:
+                gcs_uris = future.result()
+            except Exception as ex:
+                print(f"Zoomed view for {storyboard_item['room_name']} failed: {ex}")
+                gcs_uris = []
+            if gcs_uris:
+                storyboard_item["styled_image_uri"] = gcs_uris[0]
+                storyboard_item["styled_image_display_url"] = create_display_url(
+                    gcs_uris[0]
+                )
+                _record_style(storyboard_item, gcs_uris[0])
+                changed = True
+            else:
+                failed_rooms.append(storyboard_item["room_name"])
+            state.rooms_generating.remove(storyboard_item["room_name"])
+            yield
+        if failed_rooms:
+            show_snackbar(
+                state,
+                f"Could not generate room views for: {', '.join(failed_rooms)}.",
+            )
+    finally:
+        state.rooms_generating = []
+        # Rooms whose view failed keep no item, so nothing empty is saved.
+        _drop_empty_storyboard_items(state.storyboard)
+        if changed:
+            state.storyboard = save_storyboard(
+                state.storyboard, fields=["storyboard_items"]
+            )
+        yield
+
+
+def on_design_prompt_blur(e: me.InputBlurEvent):
     """Updates the design prompt in the page state."""
     state = me.state(PageState)
     state.design_prompt = e.value
@@ -510,13 +737,23 @@ def on_upload_design_image(e: me.UploadEvent):
     """Upload design image handler."""
     state = me.state(PageState)
     file = e.files[0]
-    gcs_url = store_to_gcs(
-        "interior_design_uploads", file.name, file.mime_type, file.getvalue()
+    file.seek(0)
+    upload_future = _UPLOAD_POOL.submit(
+        store_to_gcs, "interior_design_uploads", file.name, file.mime_type, file
     )
-    state.design_image_uri = gcs_url
-    state.design_image_display_url = create_display_url(gcs_url)
+    state.is_uploading_design_image = True
     yield
 
+    try:
+        gcs_url = upload_future.result()
+        state.design_image_uri = gcs_url
+        state.design_image_display_url = create_display_url(gcs_url)
+    except Exception as ex:
+        show_snackbar(state, f"Upload failed: {ex}")
+    finally:
+        state.is_uploading_design_image = False
+        yield
+
 
 def on_select_design_image(e: LibrarySelectionChangeEvent):
     """Design image selection from library handler."""
@@ -527,29 +764,27 @@ def on_select_design_image(e: LibrarySelectionChangeEvent):
 
 
 @track_click(element_id="interior_design_design_button")
+@_single_flight("design")
 def on_design_click(e: me.ClickEvent):
     """Handles the iterative design generation."""
     state = me.state(PageState)
     state.show_snackbar = False
 
     if not state.design_prompt:
-        yield from show_snackbar(state, "Please enter a design modification prompt.")
+        show_snackbar(state, "Please enter a design modification prompt.")
+        yield
         return
 
     state.is_designing = True
     yield
 
+    changed = False
     try:
-        storyboard_item = next(
-            (
-                item
-                for item in state.storyboard["storyboard_items"]
-                if item["room_name"] == state.storyboard["selected_room"]
-            ),
-            None,
+        storyboard_item = _find_storyboard_item(
+            state.storyboard, state.selected_room
         )
         if not storyboard_item:
-            yield from show_snackbar(state, "Could not find the current room to style.")
+            show_snackbar(state, "Could not find the current room to style.")
             return
 
         images = [storyboard_item["styled_image_uri"]]
@@ -569,28 +804,29 @@ def on_design_click(e: me.ClickEvent):
             storyboard_item["styled_image_display_url"] = create_display_url(
                 gcs_uris[0]
             )
-            storyboard_item["style_history"].append(gcs_uris[0])
+            _record_style(storyboard_item, gcs_uris[0])
+            changed = True
             state.design_prompt = ""
             state.design_image_uri = ""
+            state.design_image_display_url = ""
         else:
-            yield from show_snackbar(
-                state, "Design generation failed to return a result."
-            )
+            show_snackbar(state, "Design generation failed to return a result.")
 
     except Exception as ex:
-        yield from show_snackbar(
-            state, f"An error occurred during design generation: {ex}"
-        )
+        show_snackbar(state, f"An error occurred during design generation: {ex}")
     finally:
         state.is_designing = False
-        state.storyboard = save_storyboard(state.storyboard)
+        if changed:
+            state.storyboard = save_storyboard(
+                state.storyboard, fields=["storyboard_items"]
+            )
         yield
 
 
 def on_storyboard_item_click(e: me.ClickEvent):
     """Sets the selected room when a storyboard tile is clicked."""
     state = me.state(PageState)
-    state.storyboard["selected_room"] = e.key
+    state.selected_room = e.key
     yield
 
 
@@ -612,13 +848,11 @@ def on_generate_video_click(e: me.ClickEvent):
     yield
 
     try:
-        # Step 1: Generate any missing video clips
+        # Step 1: Generate any missing video clips. The clips are independent,
+        # so they are all started at once and collected as they finish.
+        clip_futures = {}
         for item in state.storyboard["storyboard_items"]:
             if item["styled_image_uri"] and not item.get("generated_video_uri"):
-                state.video_generation_status = (
-                    f"Generating video for {item['room_name']}..."
-                )
-                yield
                 request = VideoGenerationRequest(
                     model_version_id=get_version_id_by_model_name(cfg.INTERIOR_DESIGN_VIDEO_MODEL) or "3.1-lite",
                     reference_image_gcs=item["styled_image_uri"],
@@ -632,12 +866,46 @@ def on_generate_video_click(e: me.ClickEvent):
                     resolution="720p",
                     person_generation="Allow (Adults only)",
                 )
-                video_uris, _ = generate_video(request=request)
-                if video_uris:
-                    item["generated_video_uri"] = video_uris[0]
-                    item["generated_video_display_url"] = create_display_url(
-                        video_uris[0]
-                    )
+                future = _GENERATION_POOL.submit(generate_video, request=request)
+                clip_futures[future] = item
+
+        if clip_futures:
+            state.video_generation_status = (
+                f"Generating {len(clip_futures)} video clips..."
+            )
+            yield
+        failed_rooms = []
+        for done, future in enumerate(as_completed(clip_futures), start=1):
+            item = clip_futures[future]
+            try:
+                video_uris, _ = future.result()
+            except Exception as clip_ex:
+                print(f"Video clip for {item['room_name']} failed: {clip_ex}")
+                video_uris = []
+            if video_uris:
+                item["generated_video_uri"] = video_uris[0]
+                item["generated_video_display_url"] = create_display_url(
+                    video_uris[0]
+                )
+                # Keep each finished clip even if a later one fails.
+                state.storyboard = save_storyboard(
+                    state.storyboard, fields=["storyboard_items"]
+                )
+            else:
+                failed_rooms.append(item["room_name"])
+            state.video_generation_status = (
+                f"Generated {done} of {len(clip_futures)} video clips..."
+            )
+            yield
+
+        if failed_rooms:
+            # Finished clips are saved, so a retry only regenerates these.
+            show_snackbar(
+                state,
+                f"Could not generate video clips for: {', '.join(failed_rooms)}.",
+            )
+            state.video_generation_status = ""
+            return
 
         # Step 2: Concatenate the video
         video_clips = [
@@ -646,7 +914,7 @@ def on_generate_video_click(e: me.ClickEvent):
             if item.get("generated_video_uri")
         ]
         if not video_clips:
-            yield from show_snackbar(state, "No video clips to process.")
+            show_snackbar(state, "No video clips to process.")
             state.video_generation_status = ""
             return
 
@@ -676,9 +944,7 @@ def on_generate_video_click(e: me.ClickEvent):
         media_item = MediaItem(
             id=media_item_id,
             user_email=app_state.user_email,
-            timestamp=datetime.datetime.now(
-                datetime.UTC
-            ).isoformat(),  # Convert to string
+            timestamp=_now_iso(),
             media_type="video",
             mode="Interior Design",
             gcs_uris=[final_video_uri],
@@ -695,16 +961,22 @@ def on_generate_video_click(e: me.ClickEvent):
             f"Step 4: Saving MediaItem ID ({media_item.id}) back to storyboard ({state.storyboard['id']})..."
         )
         state.storyboard["library_media_item_id"] = media_item.id
-        state.storyboard = save_storyboard(state.storyboard)
+        state.storyboard = save_storyboard(
+            state.storyboard,
+            fields=[
+                "storyboard_items",
+                "final_video_uri",
+                "final_video_display_url",
+                "library_media_item_id",
+            ],
+        )
         print("...save_storyboard called.")
 
-        yield from show_snackbar(state, "Video tour saved to library!")
+        show_snackbar(state, "Video tour saved to library!")
         state.video_generation_status = "Video tour complete!"
 
     except Exception as ex:
-        yield from show_snackbar(
-            state, f"An error occurred during video generation: {ex}"
-        )
+        show_snackbar(state, f"An error occurred during video generation: {ex}")
         state.video_generation_status = "An error occurred."
     finally:
         state.is_generating_video = False
@@ -715,14 +987,7 @@ def on_generate_video_click(e: me.ClickEvent):
 def item_detail_dialog(on_close: Callable):
     """Dialog to show details of a storyboard item."""
     state = me.state(PageState)
-    item = next(
-        (
-            item
-            for item in state.storyboard["storyboard_items"]
-            if item["room_name"] == state.selected_room_for_dialog
-        ),
-        None,
-    )
+    item = _find_storyboard_item(state.storyboard, state.selected_room_for_dialog)
     if not item:
         me.text("Error: Could not find selected item.")
         return
@@ -782,7 +1047,7 @@ def on_close_detail_dialog(e: me.ClickEvent):
 def on_edit_image_click(e: me.ClickEvent):
     """Handles the 'Edit Image' button click from the detail dialog."""
     state = me.state(PageState)
-    state.storyboard["selected_room"] = e.key
+    state.selected_room = e.key
     state.is_detail_dialog_open = False
     state.selected_room_for_dialog = None
     yield
@@ -791,11 +1056,9 @@ def on_edit_image_click(e: me.ClickEvent):
 def on_regenerate_video_click(e: me.ClickEvent):
     """Handles the 'Regenerate Video' button click from the detail dialog."""
     state = me.state(PageState)
-    if state.selected_room_for_dialog:
-        for item in state.storyboard["storyboard_items"]:
-            if item["room_name"] == state.selected_room_for_dialog:
-                item["generated_video_uri"] = None
-                break
+    item = _find_storyboard_item(state.storyboard, state.selected_room_for_dialog)
+    if item:
+        item["generated_video_uri"] = None
 
     state.is_detail_dialog_open = False
     state.selected_room_for_dialog = None
@@ -806,7 +1069,6 @@ def on_regenerate_video_click(e: me.ClickEvent):
 
 def open_info_dialog(e: me.ClickEvent):
     """Open the info dialog."""
-    print("DEBUG: open_info_dialog called")
     state = me.state(PageState)
     state.info_dialog_open = True
     yield
@@ -15,12 +15,13 @@
 
 import datetime
 import json
-from dataclasses import asdict, dataclass, field, fields
+import threading
+from dataclasses import asdict, dataclass, field
 
 import mesop as me
 
 from common.analytics import log_ui_click
-from common.metadata import MediaItem, get_media_for_page, get_media_item_by_id
+from common.metadata import MediaItem, get_media_item_by_id, get_media_page_after
 from common.utils import create_display_url, get_media_type, https_url_to_gcs_uri
 from components.header import header
 from components.interior_design.storyboard_video_tile import storyboard_video_tile
@@ -30,23 +31,57 @@ from components.media_detail_viewer.media_detail_viewer import media_detail_view
 from components.media_tile.media_tile import get_pills_for_item, media_tile
 from components.page_scaffold import page_frame, page_scaffold
 from components.scroll_sentinel.scroll_sentinel import scroll_sentinel
+from components.snackbar import snackbar
 from components.veo.extend_dialog import VeoExtendDialogState, extend_dialog
 from config.default import Default as cfg
 from state.state import AppState
 
 
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".webm", ".mkv")
+
+@dataclass
+class _OpenDialog:
+    item: MediaItem | None
+    payload: tuple[str, str, str, str] | None = None
+
+
+# The item shown in each session's open details dialog, with its serialized
+# detail-viewer payload once built. The dialog re-renders on every state change
+# while open; these let it skip the Firestore read and json.dumps. Entries are
+# dropped when the dialog opens or closes, so items edited elsewhere are
+# re-read on the next open. Oldest first.
+MAX_OPEN_DIALOGS = 256
+_open_dialogs: dict[tuple[str, str], _OpenDialog] = {}
+_open_dialogs_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class LibraryTile:
+    """The fields a library tile renders; full items are re-read on click."""
+
+    id: str = ""
+    media_type: str = "image"
+    display_url: str = ""
+    pills_json: str = "[]"
+
+
 @me.stateclass
 @dataclass
 class PageState:
     """State for the library page."""
 
     is_loading: bool = True
-    media_items_json: str = ""
+    media_tiles: list[LibraryTile] = field(default_factory=list)  # pylint: disable=E3701:invalid-field-call
     show_details_dialog: bool = False
     selected_media_item_id: str | None = None
     initial_load_complete: bool = False
-    current_page: int = 1
+    # Timestamp and id of the last document scanned; empty for the first page.
+    next_page_cursor_timestamp: str = ""
+    next_page_cursor_id: str = ""
     all_items_loaded: bool = False
+    # The last load came back short or failed, so the scroll sentinel won't
+    # fire again on its own.
+    show_load_more: bool = False
     user_filter: str = "mine"  # "all" or "mine"
     type_filters: list[str] = field(
         default_factory=lambda: ["all"],
@@ -56,6 +91,8 @@ class PageState:
     extend_dialog_state: VeoExtendDialogState = field(
         default_factory=VeoExtendDialogState,
     )
+    snackbar_message: str = ""
+    show_snackbar: bool = False
 
 
 def on_load(e: me.LoadEvent):
@@ -66,6 +103,7 @@ def on_load(e: me.LoadEvent):
     # If it's a permalink, skip the initial load and just open the dialog.
     # The dialog has its own logic to fetch the specific item.
     if media_id and not pagestate.show_details_dialog:
+        _forget_open_dialog(media_id)
         pagestate.selected_media_item_id = media_id
         pagestate.show_details_dialog = True
     else:
@@ -85,55 +123,95 @@ def _load_media(pagestate: PageState, is_filter_change: bool = False):
     )
 
     if is_filter_change:
-        pagestate.current_page = 1
-        pagestate.media_items_json = "[]"
+        pagestate.next_page_cursor_timestamp = ""
+        pagestate.next_page_cursor_id = ""
+        pagestate.media_tiles = []
         pagestate.all_items_loaded = False
 
     pagestate.is_loading = True
+    pagestate.show_load_more = False
     yield
 
-    new_items = get_media_for_page(
-        page=pagestate.current_page,
-        media_per_page=cfg().LIBRARY_MEDIA_PER_PAGE,
-        sort_by_timestamp=True,
-        type_filters=pagestate.type_filters,
-        filter_by_user_email=user_email_to_filter,
-        error_filter=pagestate.error_filter,
+    media_per_page = cfg().LIBRARY_MEDIA_PER_PAGE
+    start_after = (
+        (pagestate.next_page_cursor_timestamp, pagestate.next_page_cursor_id)
+        if pagestate.next_page_cursor_id
+        else None
     )
+    try:
+        new_items, next_cursor = get_media_page_after(
+            media_per_page=media_per_page,
+            start_after=start_after,
+            type_filters=pagestate.type_filters,
+            filter_by_user_email=user_email_to_filter,
+            error_filter=pagestate.error_filter,
+        )
+    except Exception:
+        # Keep the cursor so the user can retry from where the load failed.
+        pagestate.show_load_more = True
+        pagestate.snackbar_message = "Could not load media. Please try again."
+        pagestate.show_snackbar = True
+        pagestate.is_loading = False
+        yield
+        return
 
-    if not new_items:
-        pagestate.all_items_loaded = True
+    if next_cursor:
+        pagestate.next_page_cursor_timestamp, pagestate.next_page_cursor_id = (
+            next_cursor
+        )
+        pagestate.show_load_more = len(new_items) < media_per_page
     else:
-        existing_items = []
-        if pagestate.media_items_json and pagestate.media_items_json != "[]":
-            try:
-                existing_items = json.loads(pagestate.media_items_json)
-            except json.JSONDecodeError:
-                existing_items = []
-
-        new_items_dicts = [asdict(item) for item in new_items]
-
+        pagestate.all_items_loaded = True
+    if new_items:
+        new_tiles = [_tile_for_item(item) for item in new_items]
         if is_filter_change:
-            combined = new_items_dicts
+            pagestate.media_tiles = new_tiles
         else:
-            combined = existing_items + new_items_dicts
-
-        pagestate.media_items_json = json.dumps(combined, default=str)
+            pagestate.media_tiles = pagestate.media_tiles + new_tiles
 
     pagestate.is_loading = False
     yield
 
 
+def _tile_for_item(item: MediaItem) -> LibraryTile:
+    """Resolves an item's display URL, render type and pills once per load."""
+    gcs_uri = (
+        item.gcsuri if item.gcsuri else (item.gcs_uris[0] if item.gcs_uris else None)
+    )
+    https_url = create_display_url(gcs_uri) if gcs_uri else ""
+    render_type = get_media_type(mime_type=item.mime_type, url=https_url)
+
+    # Use thumbnail as a static preview for video tiles when available
+    display_url = https_url
+    display_type = render_type
+    if render_type == "video" and getattr(item, "thumbnail_uri", None):
+        thumbnail_url = create_display_url(item.thumbnail_uri)
+        if not thumbnail_url.lower().endswith(VIDEO_EXTENSIONS):
+            display_url = thumbnail_url
+            display_type = "image"
+
+    return LibraryTile(
+        id=item.id,
+        media_type=display_type,
+        display_url=display_url,
+        pills_json=get_pills_for_item(item, https_url),
+    )
+
+
 def on_load_more(e: me.WebEvent):
     """Event handler for infinite scroll, fetches the next page of items."""
     pagestate = me.state(PageState)
     if pagestate.is_loading or pagestate.all_items_loaded:
         return
 
-    pagestate.current_page += 1
     yield from _load_media(pagestate)
 
 
+def on_snackbar_dismiss(e: me.WebEvent):
+    pagestate = me.state(PageState)
+    pagestate.show_snackbar = False
+
+
 def on_user_filter_change(e: me.ButtonToggleChangeEvent):
     """Handles changes to the user filter."""
     pagestate = me.state(PageState)
@@ -224,78 +302,81 @@ def library_content():
                 width="100%",
             ),
         ):
-            items_dicts = (
-                json.loads(pagestate.media_items_json)
-                if pagestate.media_items_json
-                else []
-            )
-            media_items = []
-            for d in items_dicts:
-                valid_keys = {f.name for f in fields(MediaItem)}
-                clean_d = {k: v for k, v in d.items() if k in valid_keys}
-                if "timestamp" in clean_d and isinstance(clean_d["timestamp"], str):
-                    try:
-                        clean_d["timestamp"] = datetime.datetime.fromisoformat(
-                            clean_d["timestamp"],
-                        )
-                    except ValueError:
-                        pass
-                media_items.append(MediaItem(**clean_d))
-
-            if not media_items and not pagestate.is_loading:
+            if (
+                not pagestate.media_tiles
+                and not pagestate.is_loading
+                and not pagestate.show_load_more
+            ):
                 with me.box(
                     style=me.Style(padding=me.Padding.all(20), text_align="center"),
                 ):
                     me.text("No media items found for the selected filters.")
             else:
-                for item in media_items:
-                    gcs_uri = (
-                        item.gcsuri
-                        if item.gcsuri
-                        else (item.gcs_uris[0] if item.gcs_uris else None)
-                    )
-                    https_url = create_display_url(gcs_uri) if gcs_uri else ""
-                    render_type = get_media_type(
-                        mime_type=item.mime_type,
-                        url=https_url,
-                    )
-
-                    # Use thumbnail as a static preview for video tiles when available
-                    thumbnail_url = ""
-                    if getattr(item, "thumbnail_uri", None):
-                        thumbnail_url = create_display_url(item.thumbnail_uri)
-
-                    display_url = https_url
-                    display_type = render_type
-                    if render_type == "video" and thumbnail_url:
-                        if not any(
-                            thumbnail_url.lower().endswith(ext)
-                            for ext in [".mp4", ".mov", ".avi", ".webm", ".mkv"]
-                        ):
-                            display_url = thumbnail_url
-                            display_type = "image"
-
+                for tile in pagestate.media_tiles:
                     media_tile(
-                        key=item.id,
+                        key=tile.id,
                         on_click=on_media_item_click,
-                        media_type=display_type,
-                        https_url=display_url,
-                        pills_json=get_pills_for_item(item, https_url),
+                        media_type=tile.media_type,
+                        https_url=tile.display_url,
+                        pills_json=tile.pills_json,
                     )
 
+        if pagestate.show_load_more and not pagestate.is_loading:
+            with me.box(
+                style=me.Style(
+                    display="flex",
+                    justify_content="center",
+                    padding=me.Padding.all(20),
+                ),
+            ):
+                me.button("Load more", on_click=on_load_more, type="stroked")
+
         scroll_sentinel(
             on_visible=on_load_more,
             is_loading=pagestate.is_loading,
             all_items_loaded=pagestate.all_items_loaded,
         )
 
+        snackbar(
+            is_visible=pagestate.show_snackbar,
+            label=pagestate.snackbar_message,
+            on_dismiss=on_snackbar_dismiss,
+        )
+
         library_dialog(pagestate)
         extend_dialog(pagestate.extend_dialog_state, on_close=on_close_extend_dialog)
 
 
+def _open_dialog_key(item_id: str) -> tuple[str, str]:
+    return (me.state(AppState).session_id, item_id)
+
+
+def _open_dialog(item_id: str) -> _OpenDialog:
+    """Returns the open dialog's item, reading it from Firestore on first render."""
+    key = _open_dialog_key(item_id)
+    with _open_dialogs_lock:
+        entry = _open_dialogs.get(key)
+    if entry:
+        return entry
+
+    entry = _OpenDialog(item=get_media_item_by_id(item_id))
+    with _open_dialogs_lock:
+        _open_dialogs[key] = entry
+        while len(_open_dialogs) > MAX_OPEN_DIALOGS:
+            del _open_dialogs[next(iter(_open_dialogs))]
+    return entry
+
+
+def _forget_open_dialog(item_id: str | None) -> None:
+    if item_id:
+        with _open_dialogs_lock:
+            _open_dialogs.pop(_open_dialog_key(item_id), None)
+
+
 def on_media_item_click(e: me.ClickEvent):
     """Saves the selected item's ID to the state and opens the dialog."""
     pagestate = me.state(PageState)
+    _forget_open_dialog(e.key)
     pagestate.selected_media_item_id = e.key
     pagestate.show_details_dialog = True
     yield
@@ -337,12 +418,12 @@ def on_close_extend_dialog(e: me.ClickEvent):
 
 @me.component
 def library_dialog(pagestate: PageState):
-    """Renders the details dialog. Fetches the item on-demand to avoid state issues."""
+    """Renders the details dialog. Fetches the item once per open to avoid state issues."""
     # The dialog is always in the DOM, just hidden/shown via is_open.
     # We only fetch and render the content if an item is selected.
     if pagestate.show_details_dialog and pagestate.selected_media_item_id:
-        # FETCH ON DEMAND
-        item_to_display = get_media_item_by_id(pagestate.selected_media_item_id)
+        # FETCH ON DEMAND, once per open dialog
+        item_to_display = _open_dialog(pagestate.selected_media_item_id).item
 
         with lightbox_dialog(is_open=True, on_close=on_close_details_dialog):  # pylint: disable=E1129:not-context-manager
             if not item_to_display:
@@ -379,6 +460,7 @@ def library_dialog(pagestate: PageState):
 def on_close_details_dialog(e: me.ClickEvent):
     pagestate = me.state(PageState)
     carousel_state = me.state(CarouselState)
+    _forget_open_dialog(pagestate.selected_media_item_id)
     pagestate.show_details_dialog = False
     pagestate.selected_media_item_id = None
     carousel_state.current_index = 0
@@ -582,9 +664,16 @@ def render_tour_detail_dialog(storyboard: dict):
             )
 
 
-@me.component
-def render_default_detail_dialog(item: MediaItem):
-    """Renders the default detail view for standard media items."""
+def _detail_payload(item: MediaItem) -> tuple[str, str, str, str]:
+    """Returns the render type and JSON payloads the detail viewer shows for `item`.
+
+    Built once per open dialog and reused on its re-renders.
+    """
+    with _open_dialogs_lock:
+        entry = _open_dialogs.get(_open_dialog_key(item.id))
+    if entry and entry.item is item and entry.payload:
+        return entry.payload
+
     primary_urls = []
     # If there are multiple URIs in gcs_uris, create a display URL for each.
     if item.gcs_uris:
@@ -612,18 +701,32 @@ def render_default_detail_dialog(item: MediaItem):
         url=primary_urls[0] if primary_urls else "",
     )
 
+    payload = (
+        render_type,
+        json.dumps(primary_urls),
+        json.dumps(metadata),
+        json.dumps(asdict(item), indent=2, default=json_default_serializer),
+    )
+    if entry and entry.item is item:
+        entry.payload = payload
+    return payload
+
+
+@me.component
+def render_default_detail_dialog(item: MediaItem):
+    """Renders the default detail view for standard media items."""
+    render_type, primary_urls_json, metadata_json, raw_metadata_json = (
+        _detail_payload(item)
+    )
+
     # The main detail viewer now only shows the primary asset and metadata
     media_detail_viewer(
         media_type=render_type,
-        primary_urls_json=json.dumps(primary_urls),
+        primary_urls_json=primary_urls_json,
         source_urls_json="[]",  # Pass empty list as sources are rendered below
-        metadata_json=json.dumps(metadata),
+        metadata_json=metadata_json,
         id=item.id,
-        raw_metadata_json=json.dumps(
-            asdict(item),
-            indent=2,
-            default=json_default_serializer,
-        ),
+        raw_metadata_json=raw_metadata_json,
         on_edit_click=handle_edit_click,
         on_veo_click=on_veo_click,
         on_extend_click=on_extend_click,
@@ -85,7 +85,7 @@ def page_content():
             )
         ):
             for item in state.media_items:
-                gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
+                gcs_uri = item.primary_uri
                 if gcs_uri:
                     me.image(
                         src=create_display_url(gcs_uri),
@@ -101,7 +101,7 @@ def page_content():
             )
         ):
             for item in state.media_items:
-                gcs_uri = item.gcsuri or (item.gcs_uris[0] if item.gcs_uris else None)
+                gcs_uri = item.primary_uri
                 if gcs_uri:
                     me.image(
                         src=create_display_url(gcs_uri),
@@ -11,8 +11,12 @@ class PageState:
     """State for the Interior Design page."""
 
     storyboard: dict = field(default_factory=dict)
+    is_loading_storyboard: bool = False
+    is_uploading_floor_plan: bool = False
+    is_uploading_design_image: bool = False
     is_generating: bool = False
     is_generating_zoom: bool = False
+    rooms_generating: list[str] = field(default_factory=list)
     is_designing: bool = False
     is_generating_video: bool = False
     video_generation_status: str = ""
@@ -20,6 +24,7 @@ class PageState:
     snackbar_message: str = ""
     final_video_uri: str = ""
     is_detail_dialog_open: bool = False
+    selected_room: str = ""
     selected_room_for_dialog: str | None = None
     error_message: str = ""
     design_prompt: str = ""
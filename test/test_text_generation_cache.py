@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the Firestore-backed text generation cache."""
+
+# ruff: noqa: S101
+
+import datetime
+from unittest.mock import MagicMock
+
+from common import text_generation_cache
+from common.text_generation_cache import get_cached_text, make_cache_key
+
+
+def test_cache_key_ignores_media_order() -> None:
+    """The same media set in a different order produces the same key."""
+    key_a = make_cache_key("prompt", ["gs://b/2.png", "gs://b/1.png"], "model")
+    key_b = make_cache_key("prompt", ["gs://b/1.png", "gs://b/2.png"], "model")
+
+    assert key_a == key_b
+
+
+def test_cache_key_depends_on_model() -> None:
+    """Switching models must not reuse another model's output."""
+    assert make_cache_key("prompt", [], "model-a") != make_cache_key(
+        "prompt", [], "model-b"
+    )
+
+
+def _mock_db_with_entry(monkeypatch, data: dict | None) -> None:
+    doc = MagicMock()
+    doc.exists = data is not None
+    doc.to_dict.return_value = data
+    db = MagicMock()
+    db.collection.return_value.document.return_value.get.return_value = doc
+    monkeypatch.setattr(text_generation_cache, "db", db)
+
+
+def test_get_cached_text_returns_fresh_entry(monkeypatch) -> None:
+    """A recent entry is returned as-is."""
+    now = datetime.datetime.now(datetime.UTC)
+    _mock_db_with_entry(monkeypatch, {"text": "cached", "ts": now})
+
+    assert get_cached_text("key") == "cached"
+
+
+def test_get_cached_text_skips_expired_entry(monkeypatch) -> None:
+    """Entries older than the TTL are treated as a miss."""
+    old = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=30)
+    _mock_db_with_entry(monkeypatch, {"text": "stale", "ts": old})
+
+    assert get_cached_text("key") is None
+
+
+def test_get_cached_text_treats_errors_as_miss(monkeypatch) -> None:
+    """Firestore failures never propagate to the caller."""
+    db = MagicMock()
+    db.collection.side_effect = RuntimeError("unavailable")
+    monkeypatch.setattr(text_generation_cache, "db", db)
+
+    assert get_cached_text("key") is None
+
+
+def test_semantic_lookup_requires_matching_media(monkeypatch) -> None:
+    """Near-duplicate prompts only hit when the media set and model match."""
+    monkeypatch.setattr(text_generation_cache, "_semantic_index_loaded", True)
+    monkeypatch.setattr(text_generation_cache, "_semantic_entries", [])
+    monkeypatch.setattr(text_generation_cache, "db", None)
+    text_generation_cache.set_cached_text(
+        "key", "cached", embedding=[1.0, 0.0], media_key="media-a"
+    )
+
+    assert (
+        text_generation_cache.find_similar_cached_text([0.99, 0.05], "media-a")
+        == "cached"
+    )
+    assert text_generation_cache.find_similar_cached_text([0.99, 0.05], "media-b") is None
+    assert text_generation_cache.find_similar_cached_text([0.0, 1.0], "media-a") is None
+
+
+def test_empty_text_is_not_cached(monkeypatch) -> None:
+    """A blank response is neither written nor added to the semantic index."""
+    db = MagicMock()
+    monkeypatch.setattr(text_generation_cache, "db", db)
+    monkeypatch.setattr(text_generation_cache, "_semantic_entries", [])
+    text_generation_cache.set_cached_text(
+        "key", "  ", embedding=[1.0, 0.0], media_key="media"
+    )
+
+    db.collection.assert_not_called()
+    assert text_generation_cache._semantic_entries == []
@@ -143,3 +143,48 @@ def test_process_videos_finishes_short_mismatched_transition(
 
     assert output_uri == "gs://test-bucket/processed/output.mp4"
     assert len(uploaded["contents"]) > 0
+
+
+def test_process_videos_concat_copies_matching_clips_without_reencoding(
+    video_processing,
+    monkeypatch,
+    tmp_path,
+):
+    first_video = tmp_path / "first.mp4"
+    second_video = tmp_path / "second.mp4"
+    _write_clip(first_video, duration=0.5)
+    _write_clip(second_video, duration=0.5, color=(0, 0, 255))
+
+    videos_by_uri = {
+        "gs://test/input/first.mp4": first_video.read_bytes(),
+        "gs://test/input/second.mp4": second_video.read_bytes(),
+    }
+    monkeypatch.setattr(
+        video_processing,
+        "download_from_gcs",
+        lambda uri: videos_by_uri[uri],
+    )
+
+    def fail_reencode(*args, **kwargs):
+        raise AssertionError("matching clips should be stream-copied")
+
+    monkeypatch.setattr(video_processing, "concatenate_videoclips", fail_reencode)
+
+    uploaded = {}
+
+    def store_to_gcs(**kwargs):
+        uploaded["contents"] = kwargs["contents"]
+        return "gs://test-bucket/processed/output.mp4"
+
+    monkeypatch.setattr(video_processing, "store_to_gcs", store_to_gcs)
+
+    output_uri = video_processing.process_videos(
+        ["gs://test/input/first.mp4", "gs://test/input/second.mp4"],
+        transition="concat",
+    )
+
+    assert output_uri == "gs://test-bucket/processed/output.mp4"
+    joined_video = tmp_path / "joined.mp4"
+    joined_video.write_bytes(uploaded["contents"])
+    with video_processing.VideoFileClip(str(joined_video)) as joined:
+        assert joined.duration == pytest.approx(1.0, abs=0.2)